@@ -1,23 +1,61 @@
-from flask import Flask, request, jsonify
-from flask_migrate import Migrate
+from flask import Flask, request, jsonify, g
+from flask.cli import with_appcontext
 from flask_restful import Api, Resource
 from flask_cors import CORS
-from flask_jwt_extended import JWTManager, create_access_token, jwt_required, get_jwt_identity
-from werkzeug.security import generate_password_hash, check_password_hash
+from flask_jwt_extended import JWTManager, create_access_token
 from models import db, User, Job, JobApplication, Payment, ExtraResource
+from encoders import init_json
+from queries import jobs_page, open_jobs_minute, page_size, project, rows_to_dicts, applications_query, payments_query, resources_query
+from search import search_jobs
+from skills import skill_index, tokenize_skills
+from similar import similar_jobs, similar_job_cards
+from autocomplete import autocomplete
+from facets import facet_counts
+from cache import response_cache
+from etags import conditional
+from bulk import read_rows, ingest_jobs, ingest_applications, update_application_status
+from sqlite_profile import init_sqlite
+from exports import ndjson_response, stream_format, csv_response, payments_export, applications_export
+from config import Config, configure_database
+from replica import replicas, replica_reads
+from passwords import passwords, PasswordsBusy
+from auth import auth, roles_required
+from prefork import prefork
+from startup import migrate_commands, startup_profile
+import click
 import datetime
 
-app = Flask(__name__)
-cors = CORS(app, origins="*")
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///Job.db'
-app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-app.config['SECRET_KEY'] = 'your_secret_key'  # Change to a secure key
-app.config['JWT_SECRET_KEY'] = 'your_jwt_secret_key'  # Change to a secure key
+jwt = JWTManager()
+
+
+# Builds the app from Config, with overrides from config (a dict), e.g.
+#   create_app({'SQLALCHEMY_DATABASE_URI': 'postgresql+psycopg2://localhost/jobs_test'})
+# Nothing is built at import time; flask finds this factory (FLASK_APP=app),
+# servers use wsgi.py or asgi.py
+def create_app(config=None):
+    app = Flask(__name__)
+    CORS(app, origins="*")
+    app.config.from_object(Config)
+    app.config.update(config or {})
+    configure_database(app.config)
+
+    db.init_app(app)
+    init_sqlite(app)
+    api = Api(app)
+    init_json(app, api)
+    response_cache.init_app(app)
+    jwt.init_app(app)
+    auth.init_app(app)
+    replicas.init_app(app)
+    passwords.init_app(app)
+    prefork.init_app(app)
+    register_routes(api)
+    app.cli.add_command(rebuild_similar_jobs)
+    app.cli.add_command(refresh_replica)
+    app.cli.add_command(migrate_commands)
+    app.cli.add_command(startup_profile)
+    return app
 
-db.init_app(app)
-migrate = Migrate(app, db)
-api = Api(app)
-jwt = JWTManager(app)
 
 # Base route that lists all available API endpoints with explanations
 class BaseRoute(Resource):
@@ -25,14 +63,19 @@ class BaseRoute(Resource):
         return jsonify({
             "message": "Welcome to the Job Management API! Below are the available routes:",
             "routes": {
-                "/get_jobs": "Retrieve all jobs.",
+                "/get_jobs": "Retrieve jobs a page at a time, newest first. Filter with location, job_type, salary_min, salary_max, is_active and open=true (deadline not passed), trim with fields; pass the X-Next-Cursor response header back as ?cursor= for the next page (e.g., /get_jobs?job_type=Full-time&limit=20).",
+                "/job_facets": "Count jobs per job type, location and salary bucket, with the same filters as /get_jobs (e.g., /job_facets?open=true).",
                 "/get_job": "Retrieve a job by ID or job name (e.g., /get_job?job_id=1 or /get_job?job_name=Software Engineer).",
-                "/get_users": "Retrieve all users.",
+                "/search_jobs": "Search job titles, descriptions, skills, benefits, employers and locations, best matches first; the X-Next-Page response header gives the next page (e.g., /search_jobs?q=python developer&page=2).",
+                "/match_jobs": "Retrieve open jobs ranked by skill overlap with a user's skills or a skills list (e.g., /match_jobs?user_id=1 or /match_jobs?skills=Python, SQL&k=5).",
+                "/similar_jobs": "Retrieve open jobs similar to a job (e.g., /similar_jobs?job_id=1&k=5).",
+                "/autocomplete": "Suggest job titles and employers for a prefix, most popular first (e.g., /autocomplete?q=data sc).",
+                "/get_users": "Retrieve all users. Trim the response with fields (e.g., /get_users?fields=username,email).",
                 "/get_user": "Retrieve a user by ID or username (e.g., /get_user?user_id=1 or /get_user?username=john_doe).",
                 "/add_user": "Add a new user.",
                 "/update_user/<int:user_id>": "Update a user by ID.",
                 "/delete_user/<int:user_id>": "Delete a user by ID.",
-                "/get_payments": "Retrieve all payments.",
+                "/get_payments": "Retrieve all payments. Add stream=ndjson to stream them one JSON object per line (e.g., /get_payments?stream=ndjson).",
                 "/get_payment": "Retrieve a payment by ID or username (e.g., /get_payment?payment_id=1 or /get_payment?username=john_doe).",
                 "/add_payment": "Add a new payment.",
                 "/get_job_resources": "Retrieve all extra resources for a job.",
@@ -40,9 +83,15 @@ class BaseRoute(Resource):
                 "/add_job_resource": "Add a new extra resource.",
                 "/update_job_resource/<int:resource_id>": "Update a resource by ID.",
                 "/delete_job_resource/<int:resource_id>": "Delete a resource by ID.",
-                "/get_applications": "Retrieve all job applications.",
+                "/get_applications": "Retrieve all job applications. Add stream=ndjson to stream them one JSON object per line (e.g., /get_applications?stream=ndjson).",
                 "/get_application": "Retrieve a job application by ID, username, or job name (e.g., /get_application?application_id=1 or /get_application?username=john_doe or /get_application?job_name=Software Engineer).",
                 "/add_application": "Add a new job application.",
+                "/bulk/jobs": "Create or update many jobs from a JSON array or an NDJSON (application/x-ndjson) upload. Rows with an existing external_id update that job; invalid rows are reported by row number and skipped.",
+                "/bulk/applications": "Create many job applications from a JSON array or an NDJSON upload of {user_id, job_id, status, application_date} rows, with a result per row.",
+                "/applications/status": "Move many applications to a new status in one update, optionally only from a given status (e.g., PUT {\"application_ids\": [1, 2], \"status\": \"accepted\", \"from_status\": \"pending\"}), with a result per application.",
+                "/export/payments.csv": "Download payments with their users as CSV, optionally between dates (e.g., /export/payments.csv?from=2025-01-01&to=2025-01-31). Gzip-compressed when the client accepts it.",
+                "/export/applications.csv": "Download job applications with their users and jobs as CSV, optionally between dates (e.g., /export/applications.csv?from=2025-01-01&to=2025-01-31). Gzip-compressed when the client accepts it.",
+                "/cache_stats": "Response cache hit, miss and eviction counters.",
             }
         })
 
@@ -53,13 +102,17 @@ class RegisterUser(Resource):
         username = data.get('username')
         email = data.get('email')
         password = data.get('password')
-        role = data.get('role', 'graduate')
+        skills = data.get('skills')
 
         if User.query.filter_by(email=email).first():
             return jsonify({"message": "User already exists"}), 400
 
-        hashed_password = generate_password_hash(password)
-        new_user = User(username=username, email=email, password_hash=hashed_password, role=role)
+        try:
+            hashed_password = passwords.hash(password)
+        except PasswordsBusy as e:
+            return jsonify({"error": str(e)}), 429, {'Retry-After': '1'}
+        # Everyone signs up as a graduate; only an admin sets other roles (/update_user)
+        new_user = User(username=username, email=email, password_hash=hashed_password, role='graduate', skills=skills)
         db.session.add(new_user)
         db.session.commit()
 
@@ -73,89 +126,191 @@ class LoginUser(Resource):
         password = data.get('password')
 
         user = User.query.filter_by(email=email).first()
-        if not user or not check_password_hash(user.password_hash, password):
+        if not user:
+            return jsonify({"message": "Invalid credentials"}), 401
+        try:
+            valid, new_hash = passwords.check(user.password_hash, password)
+        except PasswordsBusy as e:
+            return jsonify({"error": str(e)}), 429, {'Retry-After': '1'}
+        if not valid:
             return jsonify({"message": "Invalid credentials"}), 401
+        # Hashed with older settings; store it again with the current ones
+        if new_hash:
+            user.password_hash = new_hash
+            db.session.commit()
 
-        access_token = create_access_token(identity={'id': user.id, 'role': user.role})
+        # The role rides along in the token, so authorization needs no user lookup
+        access_token = create_access_token(identity=str(user.id), additional_claims={'role': user.role})
         return jsonify(access_token=access_token), 200
 
 # Protected Route Example
 class ProtectedRoute(Resource):
-    @jwt_required()
+    @roles_required()
     def get(self):
-        current_user = get_jwt_identity()
-        return jsonify(logged_in_as=current_user), 200
+        return jsonify(logged_in_as={'id': g.principal.id, 'role': g.principal.role}), 200
+
+# Revokes the access token sent with the request
+class LogoutUser(Resource):
+    @roles_required()
+    def post(self):
+        auth.revocations.revoke(g.principal)
+        return jsonify({"message": "Logged out"}), 200
 
 # Job Routes
 class GetJobs(Resource):
+    @conditional('jobs', open_jobs_minute)
+    @response_cache.cached('jobs', open_jobs_minute)
+    def get(self):
+        # One page of jobs, newest first, optionally filtered and trimmed
+        # (e.g., /get_jobs?location=Remote&job_type=Full-time&open=true&limit=20&fields=title,employer)
+        try:
+            jobs_list, next_cursor = jobs_page(request.args)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
+        response = jsonify(jobs_list)
+        # Pass this back as ?cursor= to fetch the next page
+        if next_cursor:
+            response.headers['X-Next-Cursor'] = next_cursor
+        return response
+
+
+class GetJobFacets(Resource):
     def get(self):
-        jobs = Job.query.all()  # Retrieve all jobs
-        jobs_list = []
-        for job in jobs:
-            job_data = job.to_dict()  # Get the full job dict
-            job_data.pop('applications', None)  # Remove applications field if present
-            job_data.pop('extra_resources', None)  # Remove extra_resources field if present
-            jobs_list.append(job_data)
-        return jsonify(jobs_list)  # Return the filtered list of jobs
+        # Counts per job_type, location and salary bucket for the jobs /get_jobs
+        # would list with the same filters (e.g., /job_facets?location=Remote&open=true)
+        try:
+            return jsonify(facet_counts(request.args))
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
 
 
 class GetJob(Resource):
+    @conditional('jobs')
+    @response_cache.cached(lambda args: f"job:{args.get('job_id')}" if args.get('job_id') else 'jobs')
     def get(self):
         job_id = request.args.get('job_id', type=int)
         job_name = request.args.get('job_name', type=str)
 
+        try:
+            fields, query = project(Job, 'detail', request.args)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
         if job_id:
-            job = Job.query.get(job_id)
+            job = query.filter(Job.id == job_id).first()
             if not job:
                 return jsonify({"message": f"Job with ID {job_id} not found."}), 404
         elif job_name:
-            job = Job.query.filter_by(title=job_name).first()
+            job = query.filter(Job.title == job_name).first()
             if not job:
                 return jsonify({"message": f"Job with name '{job_name}' not found."}), 404
         else:
             return jsonify({"error": "Either job_id or job_name must be provided"}), 400
 
-        job_data = job.to_dict()  # Get the full job dict
-        job_data.pop('applications', None)  # Remove applications field
-        job_data.pop('extra_resources', None)  # Remove extra_resources field
-        return jsonify(job_data)  # Return the filtered job data
+        return jsonify(dict(zip(fields, job)))
+
+
+class SearchJobs(Resource):
+    def get(self):
+        # Ranked full-text search over title, description, skills, benefits, employer and location
+        # (e.g., /search_jobs?q=python developer&page=2&limit=20)
+        try:
+            page = request.args.get('page', 1, type=int)
+            if page < 1:
+                raise ValueError("page must be a positive number.")
+            results, has_more = search_jobs(
+                request.args.get('q', type=str),
+                page=page,
+                limit=page_size(request.args.get('limit', type=int))
+            )
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
 
-    
+        response = jsonify(results)
+        if has_more:
+            response.headers['X-Next-Page'] = str(page + 1)
+        return response
+
+class MatchJobs(Resource):
+    def get(self):
+        # Open jobs ranked by how many of their required skills a graduate has
+        # (e.g., /match_jobs?user_id=1&k=5 or /match_jobs?skills=Python, SQL)
+        user_id = request.args.get('user_id', type=int)
+        skills = request.args.get('skills', type=str)
+        k = max(1, min(request.args.get('k', 10, type=int), 100))
+
+        if user_id:
+            user = db.session.get(User, user_id)
+            if not user:
+                return jsonify({"message": f"User with ID {user_id} not found."}), 404
+            skills = user.skills
+        elif not skills:
+            return jsonify({"error": "Either user_id or skills must be provided"}), 400
+
+        return jsonify(skill_index.match(tokenize_skills(skills), k=k))
+
+class SimilarJobs(Resource):
+    def get(self):
+        # Open jobs whose title, skills and description read most like this one
+        # (e.g., /similar_jobs?job_id=1&k=5)
+        job_id = request.args.get('job_id', type=int)
+        k = max(1, min(request.args.get('k', 10, type=int), 100))
+
+        if not job_id:
+            return jsonify({"error": "job_id must be provided"}), 400
+
+        cards = similar_job_cards(job_id, k=k)
+        if cards is None:
+            return jsonify({"message": f"Active job with ID {job_id} not found."}), 404
+        return jsonify(cards)
+
+class Autocomplete(Resource):
+    def get(self):
+        # Job titles and employers starting with q, most popular first; use a
+        # suggestion as job_name in /get_job, /get_job_resource or /get_application
+        # (e.g., /autocomplete?q=data sc&k=5)
+        q = request.args.get('q', '', type=str)
+        k = max(1, min(request.args.get('k', 10, type=int), 50))
+        return jsonify(autocomplete.suggest(q, k=k))
 
 # User Routes
 class GetUsers(Resource):
+    @roles_required('admin')
+    @replica_reads
     def get(self):
-        users = User.query.all()
-        users_list = []
-        for user in users:
-            user_data = user.to_dict()
-            user_data.pop('applications', None)
-            user_data.pop('payments', None)
-            users_list.append(user_data)
-        return jsonify(users_list)
+        try:
+            fields, query = project(User, 'list', request.args)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        return jsonify(rows_to_dicts(fields, query.order_by(User.id).all()))
 
 class GetUser(Resource):
+    @roles_required('admin')
     def get(self):
         user_id = request.args.get('user_id', type=int)
         username = request.args.get('username', type=str)
 
+        try:
+            fields, query = project(User, 'detail', request.args)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
         if user_id:
-            user = User.query.get(user_id)
+            user = query.filter(User.id == user_id).first()
             if not user:
                 return jsonify({"message": f"User with ID {user_id} not found."}), 404
         elif username:
-            user = User.query.filter_by(username=username).first()
+            user = query.filter(User.username == username).first()
             if not user:
                 return jsonify({"message": f"User with username '{username}' not found."}), 404
         else:
             return jsonify({"error": "Either user_id or username must be provided"}), 400
 
-        user_data = user.to_dict()
-        user_data.pop('applications', None)
-        user_data.pop('payments', None)
-        return jsonify(user_data)
+        return jsonify(dict(zip(fields, user)))
 
 class AddUser(Resource):
+    @roles_required('admin')
     def post(self):
         data = request.get_json()
         try:
@@ -164,7 +319,8 @@ class AddUser(Resource):
                 email=data['email'],
                 phone=data.get('phone'),
                 password_hash=data['password_hash'],
-                role=data.get('role', 'graduate')
+                role=data.get('role', 'graduate'),
+                skills=data.get('skills')
             )
             db.session.add(user)
             db.session.commit()
@@ -173,69 +329,65 @@ class AddUser(Resource):
             return jsonify({"error": str(e)}), 400
 
 class UpdateUser(Resource):
+    @roles_required('admin')
     def put(self, user_id):
         user = User.query.get_or_404(user_id)
         data = request.get_json()
+        try:
+            fields, query = project(User, 'detail', request.args)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
         try:
             user.username = data.get('username', user.username)
             user.email = data.get('email', user.email)
             user.phone = data.get('phone', user.phone)
             user.password_hash = data.get('password_hash', user.password_hash)
             user.role = data.get('role', user.role)
+            user.skills = data.get('skills', user.skills)
 
-            # Update related applications
-            applications = JobApplication.query.filter_by(user_id=user.id).all()
-            for app in applications:
-                app.user.username = user.username
-                app.user.email = user.email
-                app.user.phone = user.phone
-                db.session.commit()
-
-            # Update related payments
-            payments = Payment.query.filter_by(user_id=user.id).all()
-            for payment in payments:
-                payment.user.username = user.username
-                payment.user.email = user.email
-                payment.user.phone = user.phone
-                db.session.commit()
-
+            # Applications and payments point at the user by user_id and read
+            # these fields through it, so only the users row changes
             db.session.commit()
-            return jsonify(user.to_dict())
+            # The same fields as /get_user, read back without the user's
+            # applications and payments
+            return jsonify(dict(zip(fields, query.filter(User.id == user_id).one())))
         except Exception as e:
+            db.session.rollback()
             return jsonify({"error": str(e)}), 400
 
 class DeleteUser(Resource):
     def delete(self, user_id):
         user = User.query.get_or_404(user_id)
 
-        # Keep job applications and payments but retain user data in them
-        applications = JobApplication.query.filter_by(user_id=user.id).all()
-        for app in applications:
-            app.username = user.username
-            app.email = user.email
-            app.phone = user.phone
-            db.session.commit()
-
-        payments = Payment.query.filter_by(user_id=user.id).all()
-        for payment in payments:
-            payment.username = user.username
-            payment.email = user.email
-            payment.phone = user.phone
-            db.session.commit()
+        # Job applications and payments are kept, and they read the user's
+        # details through user_id, so a user who has any can't be removed
+        applications = db.session.query(JobApplication.query.filter_by(user_id=user.id).exists()).scalar()
+        payments = db.session.query(Payment.query.filter_by(user_id=user.id).exists()).scalar()
+        if applications or payments:
+            return jsonify({"error": "User has job applications or payments, which are retained; the user can't be deleted."}), 409
 
-        # Delete the user, but retain the user info in applications and payments
         db.session.delete(user)
         db.session.commit()
 
-        return jsonify({"message": "User deleted but related applications and payments retained."})
+        return jsonify({"message": "User deleted."})
 
 # Payment Routes
 class GetPayments(Resource):
+    @roles_required('admin')
+    @replica_reads
     def get(self):
-        payments = Payment.query.all()
+        # ?stream=ndjson streams every payment, one JSON object per line
+        try:
+            if stream_format(request.args):
+                return ndjson_response(payments_query().order_by(Payment.id), Payment.to_dict)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
+        payments = payments_query().all()
         return jsonify([payment.to_dict() for payment in payments])
 
 class GetPayment(Resource):
+    @roles_required('admin')
     def get(self):
         payment_id = request.args.get('payment_id', type=int)
         username = request.args.get('username', type=str)
@@ -252,7 +404,7 @@ class GetPayment(Resource):
         elif username:
             user = User.query.filter_by(username=username).first()
             if user:
-                payments = Payment.query.filter_by(user_id=user.id).all()
+                payments = payments_query().filter_by(user_id=user.id).all()
                 if payments:
                     return jsonify([payment.to_dict() for payment in payments])
                 else:
@@ -289,11 +441,18 @@ class AddPayment(Resource):
 
 # Extra Resource Routes
 class GetResources(Resource):
+    @conditional('extra_resources', 'jobs')
+    @response_cache.cached('extra_resources', 'jobs')
     def get(self):
-        resources = ExtraResource.query.all()
+        resources = resources_query().all()
         return jsonify([resource.to_dict() for resource in resources])
 
 class GetResource(Resource):
+    @conditional('extra_resources', 'jobs')
+    @response_cache.cached(
+        lambda args: f"resource:{args.get('resource_id')}" if args.get('resource_id') else 'extra_resources',
+        'jobs'
+    )
     def get(self):
         resource_id = request.args.get('resource_id', type=int)
         job_name = request.args.get('job_name', type=str)
@@ -311,7 +470,7 @@ class GetResource(Resource):
         elif job_name:
             job = Job.query.filter_by(title=job_name).first()
             if job:
-                resources = ExtraResource.query.filter_by(job_id=job.id).all()
+                resources = resources_query().filter_by(job_id=job.id).all()
                 if resources:
                     return jsonify([resource.to_dict() for resource in resources])
                 else:
@@ -319,7 +478,7 @@ class GetResource(Resource):
 
         # Handle resource_type
         elif resource_type:
-            resources = ExtraResource.query.filter_by(resource_type=resource_type).all()
+            resources = resources_query().filter_by(resource_type=resource_type).all()
             if resources:
                 return jsonify([resource.to_dict() for resource in resources])
             else:
@@ -395,23 +554,12 @@ class UpdateResource(Resource):
                     job.employer_email = data.get('employer_email', job.employer_email)
                     job.employer_phone = data.get('employer_phone', job.employer_phone)
 
-                    db.session.commit()
-
-                    applications = JobApplication.query.filter_by(job_id=job.id).all()
-                    for app in applications:
-                        app.job.title = job.title
-                        app.job.location = job.location
-                        app.job.salary_min = job.salary_min
-                        app.job.salary_max = job.salary_max
-                        app.job.job_type = job.job_type
-                        app.job.skills_required = job.skills_required
-                        app.job.benefits = job.benefits
-                        app.job.application_deadline = job.application_deadline
-                        db.session.commit()
-
+            # Applications read the job's details through job_id, so the
+            # resource and the job are all there is to write, in one transaction
             db.session.commit()
             return jsonify(resource.to_dict())
         except Exception as e:
+            db.session.rollback()
             return jsonify({"error": str(e)}), 400
 
 class DeleteResource(Resource):
@@ -419,39 +567,37 @@ class DeleteResource(Resource):
         resource = ExtraResource.query.get_or_404(resource_id)
         job = Job.query.get_or_404(resource.job_id)
 
-        # Get all related applications and retain job info in them
-        related_applications = JobApplication.query.filter_by(job_id=job.id).all()
-        for app in related_applications:
-            # Keep the job details in the application, even if job is deleted
-            app.job_title = job.title
-            app.job_location = job.location
-            app.salary_min = job.salary_min
-            app.salary_max = job.salary_max
-            app.job_type = job.job_type
-            app.skills_required = job.skills_required
-            app.benefits = job.benefits
-            app.application_deadline = job.application_deadline
+        # The job goes too once its last resource does, unless applications
+        # still refer to it (they read the job's details through job_id)
+        other_resources = db.session.query(
+            ExtraResource.query.filter(ExtraResource.job_id == job.id, ExtraResource.id != resource.id).exists()
+        ).scalar()
+        applications = db.session.query(JobApplication.query.filter_by(job_id=job.id).exists()).scalar()
 
-            db.session.commit()
-
-        # Check if the job still has other resources; if not, delete the job
-        remaining_resources = ExtraResource.query.filter_by(job_id=job.id).all()
-        if not remaining_resources:
-            db.session.delete(job)
-        
-        # Delete the resource (but not the job data from applications)
         db.session.delete(resource)
+        if not other_resources and not applications:
+            db.session.delete(job)
         db.session.commit()
 
-        return jsonify({"message": "Resource deleted, but job information retained in applications."})        
+        return jsonify({"message": "Resource deleted, but job information retained in applications."})
 
 # Job Application Routes
 class GetApplications(Resource):
+    @roles_required('admin')
+    @replica_reads
     def get(self):
-        applications = JobApplication.query.all()
+        # ?stream=ndjson streams every application, one JSON object per line
+        try:
+            if stream_format(request.args):
+                return ndjson_response(applications_query().order_by(JobApplication.id), JobApplication.to_dict)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
+        applications = applications_query().all()
         return jsonify([application.to_dict() for application in applications])
 
 class GetApplication(Resource):
+    @roles_required('admin')
     def get(self):
         application_id = request.args.get('application_id', type=int)
         username = request.args.get('username', type=str)
@@ -469,7 +615,7 @@ class GetApplication(Resource):
         elif username:
             user = User.query.filter_by(username=username).first()
             if user:
-                applications = JobApplication.query.filter_by(user_id=user.id).all()
+                applications = applications_query().filter_by(user_id=user.id).all()
                 if applications:
                     return jsonify([application.to_dict() for application in applications])
                 else:
@@ -481,7 +627,7 @@ class GetApplication(Resource):
         elif job_name:
             job = Job.query.filter_by(title=job_name).first()
             if job:
-                applications = JobApplication.query.filter_by(job_id=job.id).all()
+                applications = applications_query().filter_by(job_id=job.id).all()
                 if applications:
                     return jsonify([application.to_dict() for application in applications])
                 else:
@@ -511,33 +657,126 @@ class AddApplication(Resource):
         except Exception as e:
             return jsonify({"error": str(e)}), 400
 
+# Bulk job import for partner feeds
+class BulkJobs(Resource):
+    @roles_required('admin')
+    def post(self):
+        try:
+            rows = read_rows(request)
+            result = ingest_jobs(rows)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        return jsonify(result.to_dict()), 200
+
+
+class BulkApplications(Resource):
+    @roles_required('admin')
+    def post(self):
+        try:
+            result = ingest_applications(read_rows(request))
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        return jsonify(result.to_dict()), 200
+
+
+class ApplicationStatus(Resource):
+    @roles_required('admin')
+    def put(self):
+        data = request.get_json(silent=True) or {}
+        try:
+            result = update_application_status(data.get('application_ids'), data.get('status'), data.get('from_status'))
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        return jsonify(result.to_dict()), 200
+
+
+# CSV exports for finance, streamed so they work for any table size
+class ExportPayments(Resource):
+    @roles_required('admin')
+    @replica_reads
+    def get(self):
+        try:
+            header, query = payments_export(request.args)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        return csv_response(header, query, 'payments.csv', gzip=request.accept_encodings['gzip'] > 0)
+
+
+class ExportApplications(Resource):
+    @roles_required('admin')
+    @replica_reads
+    def get(self):
+        try:
+            header, query = applications_export(request.args)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        return csv_response(header, query, 'applications.csv', gzip=request.accept_encodings['gzip'] > 0)
+
+
+class CacheStats(Resource):
+    def get(self):
+        return jsonify(response_cache.stats())
+
 # Add resources to API with specific HTTP methods and unique routes
-api.add_resource(BaseRoute, '/')
-api.add_resource(RegisterUser, '/register')
-api.add_resource(LoginUser, '/login')
-api.add_resource(ProtectedRoute, '/protected')
-
-api.add_resource(GetJobs, '/get_jobs')
-api.add_resource(GetJob, '/get_job')  # Changed this route to handle both job ID and job name
-api.add_resource(GetUsers, '/get_users')
-api.add_resource(GetUser, '/get_user')  # Changed this route to handle both user ID and username
-api.add_resource(AddUser, '/add_user')
-api.add_resource(UpdateUser, '/update_user/<int:user_id>')
-api.add_resource(DeleteUser, '/delete_user/<int:user_id>')
-
-api.add_resource(GetPayments, '/get_payments')
-api.add_resource(GetPayment, '/get_payment')  # Changed this route to handle both payment ID and username
-api.add_resource(AddPayment, '/add_payment')
-
-api.add_resource(GetResources, '/get_job_resources') 
-api.add_resource(GetResource, '/get_job_resource')  # Changed this route to handle ID, job name, or resource type
-api.add_resource(AddResource, '/add_job_resource')
-api.add_resource(UpdateResource, '/update_job_resource/<int:resource_id>')
-api.add_resource(DeleteResource, '/delete_job_resource/<int:resource_id>')
-
-api.add_resource(GetApplications, '/get_applications')
-api.add_resource(GetApplication, '/get_application')  # Changed this route to handle application ID, username, or job name
-api.add_resource(AddApplication, '/add_application')
+def register_routes(api):
+    api.add_resource(BaseRoute, '/')
+    api.add_resource(RegisterUser, '/register')
+    api.add_resource(LoginUser, '/login')
+    api.add_resource(ProtectedRoute, '/protected')
+    api.add_resource(LogoutUser, '/logout')
+
+    api.add_resource(GetJobs, '/get_jobs')
+    api.add_resource(GetJobFacets, '/job_facets')
+    api.add_resource(GetJob, '/get_job')  # Changed this route to handle both job ID and job name
+    api.add_resource(SearchJobs, '/search_jobs')
+    api.add_resource(MatchJobs, '/match_jobs')
+    api.add_resource(SimilarJobs, '/similar_jobs')
+    api.add_resource(Autocomplete, '/autocomplete')
+    api.add_resource(GetUsers, '/get_users')
+    api.add_resource(GetUser, '/get_user')  # Changed this route to handle both user ID and username
+    api.add_resource(AddUser, '/add_user')
+    api.add_resource(UpdateUser, '/update_user/<int:user_id>')
+    api.add_resource(DeleteUser, '/delete_user/<int:user_id>')
+
+    api.add_resource(GetPayments, '/get_payments')
+    api.add_resource(GetPayment, '/get_payment')  # Changed this route to handle both payment ID and username
+    api.add_resource(AddPayment, '/add_payment')
+
+    api.add_resource(GetResources, '/get_job_resources') 
+    api.add_resource(GetResource, '/get_job_resource')  # Changed this route to handle ID, job name, or resource type
+    api.add_resource(AddResource, '/add_job_resource')
+    api.add_resource(UpdateResource, '/update_job_resource/<int:resource_id>')
+    api.add_resource(DeleteResource, '/delete_job_resource/<int:resource_id>')
+
+    api.add_resource(GetApplications, '/get_applications')
+    api.add_resource(GetApplication, '/get_application')  # Changed this route to handle application ID, username, or job name
+    api.add_resource(AddApplication, '/add_application')
+
+    api.add_resource(BulkJobs, '/bulk/jobs')
+    api.add_resource(BulkApplications, '/bulk/applications')
+    api.add_resource(ApplicationStatus, '/applications/status')
+
+    api.add_resource(ExportPayments, '/export/payments.csv')
+    api.add_resource(ExportApplications, '/export/applications.csv')
+
+    api.add_resource(CacheStats, '/cache_stats')
+
+
+# Rebuild the shared similar-jobs matrix, e.g. after reseeding the database
+@click.command('rebuild-similar-jobs')
+@with_appcontext
+def rebuild_similar_jobs():
+    similar_jobs.rebuild()
+    print("Similar jobs matrix rebuilt.")
+
+
+# Copy the primary SQLite database onto the replica file (DATABASE_REPLICA_URL)
+@click.command('refresh-replica')
+@with_appcontext
+def refresh_replica():
+    replicas.refresh()
+    print("Replica refreshed.")
+
 
 if __name__ == "__main__":
-    app.run(debug=True)
+    create_app().run(debug=True)
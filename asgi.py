@@ -0,0 +1,288 @@
+from flask import current_app, g, jsonify, request
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from concurrent.futures import ThreadPoolExecutor
+from tempfile import SpooledTemporaryFile
+from app import create_app
+from auth import roles_required
+from cache import response_cache
+from config import engine_options
+from encoders import get_backend
+from etags import conditional
+from exports import BATCH_SIZE, stream_format
+from models import db, Job, JobApplication
+from queries import jobs_page_query, open_jobs_minute, project, resources_query, applications_query
+from replica import replica_reads
+from sqlite_profile import apply_pragmas
+import asyncio
+import sys
+
+# ASGI entry point. The busiest read endpoints are served natively here with
+# an async SQLAlchemy session, so a request waiting on the database doesn't
+# hold a thread; every other route goes to the Flask app in a thread pool.
+#   uvicorn --factory asgi:create_asgi_app --workers 4
+# The async handlers use the same queries, ETags, response cache, role checks
+# and replica routing as the Flask resources in app.py, and answer the same.
+
+# Async drivers for the sync engines' databases
+ASYNC_DRIVERS = {'sqlite': 'aiosqlite', 'postgresql': 'asyncpg', 'mysql': 'aiomysql'}
+# Request bodies for the Flask routes are spooled to disk past this size
+MAX_MEMORY_BODY = 1024 * 1024
+
+
+# An async engine on the same database as one of the app's engines
+def make_async_engine(engine, config):
+    backend = engine.url.get_backend_name()
+    url = engine.url.set(drivername=f'{backend}+{ASYNC_DRIVERS[backend]}')
+    options = engine_options(url, config)
+    # asyncpg takes server settings directly, not as libpq options
+    if backend == 'postgresql' and 'connect_args' in options:
+        timeout = options['connect_args'].pop('options').split('=', 1)[1]
+        options['connect_args']['server_settings'] = {'statement_timeout': timeout}
+    # aiosqlite opens a connection (and its thread) per checkout unless pooled
+    if backend == 'sqlite' and 'pool_size' in options:
+        options['poolclass'] = AsyncAdaptedQueuePool
+    async_engine = create_async_engine(url, **options)
+    if backend == 'sqlite' and config.get('SQLITE_PRAGMAS'):
+        apply_pragmas(async_engine.sync_engine, config['SQLITE_PRAGMAS'])
+    return async_engine
+
+
+# Like RoutingSession (replica.py): SELECTs go to the replica during a
+# @replica_reads request, everything else to the primary
+class AsyncRoutingSession(Session):
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        engines = self.info['engines']
+        if bind is None and getattr(clause, 'is_select', False) and g.get('read_replica') and 'replica' in engines:
+            return engines['replica'].sync_engine
+        return engines[None].sync_engine
+
+
+# A response whose body comes from an async iterator of bytes
+class AsyncStream:
+    def __init__(self, chunks, mimetype):
+        self.chunks = chunks
+        self.mimetype = mimetype
+
+
+@conditional('jobs', open_jobs_minute)
+@response_cache.cached('jobs', open_jobs_minute)
+async def get_jobs():
+    try:
+        query, page = jobs_page_query(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    jobs_list, next_cursor = page((await g.async_session.execute(query.statement)).all())
+    response = jsonify(jobs_list)
+    if next_cursor:
+        response.headers['X-Next-Cursor'] = next_cursor
+    return response
+
+
+@conditional('jobs')
+@response_cache.cached(lambda args: f"job:{args.get('job_id')}" if args.get('job_id') else 'jobs')
+async def get_job():
+    job_id = request.args.get('job_id', type=int)
+    job_name = request.args.get('job_name', type=str)
+
+    try:
+        fields, query = project(Job, 'detail', request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    if job_id:
+        job = (await g.async_session.execute(query.filter(Job.id == job_id).limit(1).statement)).first()
+        if not job:
+            return jsonify({"message": f"Job with ID {job_id} not found."}), 404
+    elif job_name:
+        job = (await g.async_session.execute(query.filter(Job.title == job_name).limit(1).statement)).first()
+        if not job:
+            return jsonify({"message": f"Job with name '{job_name}' not found."}), 404
+    else:
+        return jsonify({"error": "Either job_id or job_name must be provided"}), 400
+
+    return jsonify(dict(zip(fields, job)))
+
+
+@conditional('extra_resources', 'jobs')
+@response_cache.cached('extra_resources', 'jobs')
+async def get_resources():
+    resources = (await g.async_session.scalars(resources_query().statement)).all()
+    return jsonify([resource.to_dict() for resource in resources])
+
+
+@roles_required('admin')
+@replica_reads
+async def get_applications():
+    try:
+        if stream_format(request.args):
+            return ndjson_stream(applications_query().order_by(JobApplication.id), JobApplication.to_dict)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    applications = (await g.async_session.scalars(applications_query().statement)).all()
+    return jsonify([application.to_dict() for application in applications])
+
+
+# ndjson_response (exports.py) for async handlers
+def ndjson_stream(query, to_dict):
+    dumps, _ = get_backend(current_app.config.get('JSON_BACKEND', 'auto'))
+
+    async def generate():
+        rows = await g.async_session.stream_scalars(query.statement, execution_options={'yield_per': BATCH_SIZE})
+        async for batch in rows.partitions():
+            yield b''.join(dumps(to_dict(row)) + b'\n' for row in batch)
+
+    return AsyncStream(generate(), 'application/x-ndjson')
+
+
+ROUTES = {
+    '/get_jobs': get_jobs,
+    '/get_job': get_job,
+    '/get_job_resources': get_resources,
+    '/get_applications': get_applications,
+}
+
+
+class AsyncAPI:
+    def __init__(self, app):
+        app.config.setdefault('ASGI_THREADS', 32)
+        self.app = app
+        self.executor = ThreadPoolExecutor(app.config['ASGI_THREADS'], thread_name_prefix='wsgi')
+        with app.app_context():
+            self.engines = {key: make_async_engine(engine, app.config) for key, engine in db.engines.items()}
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            return await self.lifespan(receive, send)
+        handler = ROUTES.get(scope['path'])
+        if scope['type'] == 'http' and scope['method'] in ('GET', 'HEAD') and handler is not None:
+            return await self.handle(handler, scope, send)
+        return await self.forward(scope, receive, send)
+
+    async def lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                for engine in self.engines.values():
+                    await engine.dispose()
+                self.executor.shutdown(wait=False)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def handle(self, handler, scope, send):
+        environ = wsgi_environ(scope, SpooledTemporaryFile())
+        async with AsyncSession(sync_session_class=AsyncRoutingSession, info={'engines': self.engines}) as session:
+            with self.app.request_context(environ):
+                stream = None
+                try:
+                    g.async_session = session
+                    result = self.app.preprocess_request()
+                    if result is None:
+                        result = await handler()
+                    if isinstance(result, AsyncStream):
+                        stream, result = result, self.app.response_class(mimetype=result.mimetype)
+                    response = self.app.process_response(self.app.make_response(result))
+                except Exception as e:
+                    stream, response = None, self.app.handle_exception(e)
+
+                await send({
+                    'type': 'http.response.start',
+                    'status': response.status_code,
+                    'headers': [(name.lower().encode('latin1'), value.encode('latin1'))
+                                for name, value in response.headers.to_wsgi_list()],
+                })
+                if stream is not None and scope['method'] != 'HEAD':
+                    async for chunk in stream.chunks:
+                        await send({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+                    await send({'type': 'http.response.body', 'body': b''})
+                else:
+                    await send({'type': 'http.response.body', 'body': response.get_data() if scope['method'] != 'HEAD' else b''})
+
+    # Runs the Flask app for one request on a pool thread. The body goes out
+    # chunk by chunk as the app yields it; the thread waits for each send, so
+    # a slow client holds back a streamed export instead of buffering it
+    async def forward(self, scope, receive, send):
+        if scope['type'] != 'http':
+            return
+        body = SpooledTemporaryFile(max_size=MAX_MEMORY_BODY)
+        while True:
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                return
+            body.write(message.get('body', b''))
+            if not message.get('more_body'):
+                break
+        # The whole body is here, so its length is known even when the client
+        # sent it chunked (no Content-Length); without one Werkzeug reads nothing
+        environ = wsgi_environ(scope, body)
+        environ['CONTENT_LENGTH'] = str(body.tell())
+        body.seek(0)
+        loop = asyncio.get_running_loop()
+
+        def sent(message):
+            asyncio.run_coroutine_threadsafe(send(message), loop).result()
+
+        def start_response(status, headers, exc_info=None):
+            sent({
+                'type': 'http.response.start',
+                'status': int(status.split(' ', 1)[0]),
+                'headers': [(name.lower().encode('latin1'), value.encode('latin1')) for name, value in headers],
+            })
+
+        def run():
+            chunks = self.app(environ, start_response)
+            try:
+                for chunk in chunks:
+                    if chunk:
+                        sent({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+                sent({'type': 'http.response.body', 'body': b''})
+            finally:
+                if hasattr(chunks, 'close'):
+                    chunks.close()
+
+        try:
+            await loop.run_in_executor(self.executor, run)
+        finally:
+            body.close()
+
+
+def wsgi_environ(scope, body):
+    server = scope.get('server') or ('localhost', 80)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', '').encode('utf-8').decode('latin1'),
+        'PATH_INFO': scope['path'].encode('utf-8').decode('latin1'),
+        'QUERY_STRING': scope['query_string'].decode('ascii'),
+        'SERVER_NAME': server[0],
+        'SERVER_PORT': str(server[1] or 80),
+        'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+        'REMOTE_ADDR': (scope.get('client') or ('', 0))[0],
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': body,
+        # Read to the end of body, whatever CONTENT_LENGTH says
+        'wsgi.input_terminated': True,
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False,
+    }
+    for name, value in scope['headers']:
+        name, value = name.decode('latin1'), value.decode('latin1')
+        if name == 'content-type':
+            key = 'CONTENT_TYPE'
+        elif name == 'content-length':
+            key = 'CONTENT_LENGTH'
+        else:
+            key = 'HTTP_' + name.upper().replace('-', '_')
+        environ[key] = f"{environ[key]},{value}" if key in environ else value
+    return environ
+
+
+def create_asgi_app(config=None):
+    return AsyncAPI(create_app(config))
@@ -0,0 +1,169 @@
+from flask import current_app, g, request, jsonify
+from flask_jwt_extended import decode_token
+from flask_jwt_extended.exceptions import JWTExtendedException
+from jwt import PyJWTError
+from sqlalchemy import select
+from collections import namedtuple
+from datetime import datetime, timedelta, timezone
+from functools import wraps
+from cache import LocalBackend
+from models import db, RevokedToken
+import hashlib
+import inspect
+import math
+import threading
+import time
+
+# Role checks for Resource methods, e.g.
+#   class GetUsers(Resource):
+#       @roles_required('admin')
+#       def get(self): ...
+#
+# Access tokens carry the user's id and role (see LoginUser), so checking a
+# request needs no User lookup. Verified tokens are kept in an LRU until they
+# expire, so a repeat request skips the signature check too. Revoked token ids
+# (/logout) live in the revoked_tokens table, fronted by a Bloom filter: a
+# request only reads the table when the filter says its token might be there.
+
+LOAD_OVERLAP = timedelta(minutes=1)
+
+Principal = namedtuple('Principal', ['id', 'role', 'jti', 'expires'])
+
+
+# Sized for capacity keys at error_rate false positives
+class BloomFilter:
+    def __init__(self, capacity, error_rate):
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    # Double hashing: the i-th position is h1 + i * h2
+    def _positions(self, key):
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        h1, h2 = int.from_bytes(digest[:8], 'little'), int.from_bytes(digest[8:], 'little') | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hashes))
+
+    def add(self, key):
+        for position in self._positions(key):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, key):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+
+class Revocations:
+    def __init__(self, capacity=100000, error_rate=0.001):
+        self.filter = BloomFilter(capacity, error_rate)
+        self.lock = threading.Lock()
+        self.loaded_until = None
+        self.next_load = 0
+        self.refresh_seconds = 5
+
+    # Adds rows revoked since the last load, including by other processes,
+    # at most every refresh_seconds. The first load reads every unexpired row
+    def load(self):
+        if time.monotonic() < self.next_load:
+            return
+        with self.lock:
+            if time.monotonic() < self.next_load:
+                return
+            query = select(RevokedToken.jti, RevokedToken.revoked_at)
+            if self.loaded_until is None:
+                query = query.where(RevokedToken.expires_at > datetime.utcnow())
+            else:
+                # Overlap the last load, for rows that committed late
+                query = query.where(RevokedToken.revoked_at >= self.loaded_until - LOAD_OVERLAP)
+            for jti, revoked_at in db.session.execute(query):
+                self.filter.add(jti)
+                self.loaded_until = max(self.loaded_until or revoked_at, revoked_at)
+            self.loaded_until = self.loaded_until or datetime.utcnow()
+            self.next_load = time.monotonic() + self.refresh_seconds
+
+    def revoke(self, principal):
+        db.session.merge(RevokedToken(
+            jti=principal.jti,
+            # Kept until the token would have expired anyway
+            expires_at=datetime.fromtimestamp(principal.expires, timezone.utc).replace(tzinfo=None)
+            if principal.expires else datetime.max,
+            revoked_at=datetime.utcnow(),
+        ))
+        db.session.commit()
+        with self.lock:
+            self.filter.add(principal.jti)
+
+    def is_revoked(self, jti):
+        self.load()
+        if jti not in self.filter:
+            return False
+        return db.session.get(RevokedToken, jti) is not None
+
+
+class Auth:
+    def __init__(self):
+        self.tokens = LocalBackend()
+        self.revocations = Revocations()
+
+    def init_app(self, app):
+        app.config.setdefault('AUTH_CACHE_SIZE', 4096)
+        app.config.setdefault('REVOCATION_CAPACITY', 100000)
+        app.config.setdefault('REVOCATION_ERROR_RATE', 0.001)
+        app.config.setdefault('REVOCATION_REFRESH_SECONDS', 5)
+        self.tokens = LocalBackend(app.config['AUTH_CACHE_SIZE'])
+        self.revocations = Revocations(app.config['REVOCATION_CAPACITY'], app.config['REVOCATION_ERROR_RATE'])
+        self.revocations.refresh_seconds = app.config['REVOCATION_REFRESH_SECONDS']
+
+    # The principal for the request's bearer token; raises ValueError if
+    # there's no valid one
+    def principal(self):
+        header = request.headers.get('Authorization', '')
+        if not header.startswith('Bearer '):
+            raise ValueError("Missing bearer token.")
+        token = header[len('Bearer '):]
+
+        principal = self.tokens.get(token)
+        if principal is None:
+            try:
+                claims = decode_token(token)
+            except (PyJWTError, JWTExtendedException) as e:
+                raise ValueError(f"Invalid token: {e}")
+            if claims.get('type') != 'access' or 'role' not in claims:
+                raise ValueError("Invalid token: not an access token.")
+            principal = Principal(int(claims['sub']), claims['role'], claims['jti'], claims.get('exp'))
+            # Cached no longer than the token is valid
+            ttl = principal.expires - time.time() if principal.expires else current_app.config['CACHE_TTL']
+            if ttl > 0:
+                self.tokens.set(token, principal, ttl)
+
+        if self.revocations.is_revoked(principal.jti):
+            raise ValueError("Token has been revoked.")
+        return principal
+
+
+auth = Auth()
+
+
+# The error response for a request that may not call the method, or None
+def authorize(roles):
+    try:
+        principal = auth.principal()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 401
+    if roles and principal.role not in roles:
+        return jsonify({"error": f"Requires role: {', '.join(roles)}."}), 403
+    g.principal = principal
+    return None
+
+
+# With no roles, any signed-in user may call the method (sync or async)
+def roles_required(*roles):
+    def decorator(method):
+        @wraps(method)
+        def wrapper(*args, **kwargs):
+            return authorize(roles) or method(*args, **kwargs)
+
+        @wraps(method)
+        async def async_wrapper(*args, **kwargs):
+            return authorize(roles) or await method(*args, **kwargs)
+
+        return async_wrapper if inspect.iscoroutinefunction(method) else wrapper
+    return decorator
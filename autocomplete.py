@@ -0,0 +1,110 @@
+from bisect import bisect_left, insort
+from collections import Counter
+from etags import table_versions
+from hooks import on_commit
+from models import db, Job, JobApplication
+import heapq
+import re
+import threading
+
+# Type-ahead over job titles and employers. Every phrase is indexed under each
+# of its word starts ("Senior Data Analyst" is found by "sen", "dat" and
+# "ana") in one sorted list, so a prefix is a bisect to the start of a range.
+# Phrases are ranked by popularity: postings plus the applications they had
+# when the index was loaded. Like the skill index (see skills.py), it is
+# rebuilt when another worker's job writes move the jobs version
+SHORT_PREFIX = 2
+
+
+def normalize(text):
+    return re.sub(r'\s+', ' ', (text or '').strip().lower())
+
+
+class Autocomplete:
+    def __init__(self):
+        self.keys = []
+        self.weights = Counter()
+        self.jobs = {}
+        self.top_cache = {}
+        self.version = None
+        self.loaded = False
+        self.lock = threading.Lock()
+
+    def load(self):
+        version = table_versions(['jobs'])[0]
+        with self.lock:
+            if self.loaded and version == self.version:
+                return
+            self.keys, self.weights, self.jobs, self.top_cache = [], Counter(), {}, {}
+            applications = dict(
+                db.session.query(JobApplication.job_id, db.func.count(JobApplication.id))
+                .group_by(JobApplication.job_id).all()
+            )
+            for job_id, title, employer in db.session.query(Job.id, Job.title, Job.employer):
+                self._add_job(job_id, title, employer, 1 + applications.get(job_id, 0))
+            self.version = version
+            self.loaded = True
+
+    def _phrase_keys(self, kind, text):
+        words = normalize(text).split(' ')
+        return [(' '.join(words[i:]), kind, text) for i in range(len(words)) if words[i]]
+
+    def _adjust(self, kind, text, delta):
+        phrase = (kind, text)
+        before = self.weights[phrase]
+        self.weights[phrase] += delta
+        if before <= 0 < self.weights[phrase]:
+            for key in self._phrase_keys(kind, text):
+                insort(self.keys, key)
+        elif self.weights[phrase] <= 0 < before:
+            for key in self._phrase_keys(kind, text):
+                del self.keys[bisect_left(self.keys, key)]
+            del self.weights[phrase]
+
+    def _add_job(self, job_id, title, employer, weight):
+        self.jobs[job_id] = [title, employer, weight]
+        self._adjust('title', title, weight)
+        self._adjust('employer', employer, weight)
+
+    def _remove_job(self, job_id):
+        title, employer, weight = self.jobs.pop(job_id)
+        self._adjust('title', title, -weight)
+        self._adjust('employer', employer, -weight)
+        return weight
+
+    def apply(self, rows):
+        with self.lock:
+            if not self.loaded:
+                return
+            self.version += 1
+            for job_id, values in rows.items():
+                weight = self._remove_job(job_id) if job_id in self.jobs else 1
+                if values is not None:
+                    self._add_job(job_id, values['title'], values['employer'], weight)
+            self.top_cache.clear()
+
+    # Top k phrases starting (at any word) with q, most popular first
+    def suggest(self, q, k=10):
+        self.load()
+        prefix = normalize(q)
+        if not prefix:
+            return []
+        with self.lock:
+            cached = self.top_cache.get((prefix, k))
+            if cached is not None:
+                return cached
+
+            start = bisect_left(self.keys, (prefix,))
+            end = bisect_left(self.keys, (prefix + '\uffff',), start)
+            phrases = {(kind, text) for _, kind, text in self.keys[start:end]}
+            top = heapq.nsmallest(k, phrases, key=lambda phrase: (-self.weights[phrase], phrase[1]))
+            results = [{'text': text, 'type': kind, 'weight': self.weights[(kind, text)]} for kind, text in top]
+
+            # One- and two-letter prefixes cover big ranges; remember them until the next write
+            if len(prefix) <= SHORT_PREFIX:
+                self.top_cache[(prefix, k)] = results
+            return results
+
+
+autocomplete = Autocomplete()
+on_commit('jobs')(autocomplete.apply)
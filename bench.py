@@ -0,0 +1,777 @@
+from sqlalchemy import text
+from datetime import datetime, timedelta
+import itertools
+import os
+import random
+import sys
+import timeit
+
+# Micro-benchmarks for the API's hot paths. Run one with
+#   python bench.py <name>
+# or all of them with no arguments
+
+
+# Helper function to report the best of several timed runs
+def report(label, func, number=5, repeat=3):
+    best = min(timeit.repeat(func, number=number, repeat=repeat)) / number
+    print(f"  {label:<40} {best * 1000:9.2f} ms")
+    return best
+
+
+# Authorization header for the admin-only endpoints
+def admin_headers(app, user_id=1):
+    from flask_jwt_extended import create_access_token
+    with app.app_context():
+        token = create_access_token(identity=str(user_id), additional_claims={'role': 'admin'})
+    return {'Authorization': f'Bearer {token}'}
+
+
+# 10k application dicts shaped like JobApplication.to_dict()
+def application_rows(count=10000):
+    now = datetime.utcnow()
+    return [
+        {
+            "application_date": now - timedelta(minutes=i),
+            "status": "pending",
+            "user": {
+                "username": f"user_{i}",
+                "email": f"user_{i}@gmail.com",
+                "phone": "+254 712345678",
+                "role": "graduate",
+                "date_joined": now - timedelta(days=i % 365)
+            },
+            "job": {
+                "title": "Software Engineer",
+                "description": "We are looking for a skilled software engineer.",
+                "location": "Nairobi, Kenya",
+                "salary_min": 900000.0,
+                "salary_max": 1200000.0,
+                "job_type": "Full-time",
+                "skills_required": "Python, JavaScript, Cloud Computing, Agile",
+                "benefits": "Health insurance, Paid vacation, Retirement plan",
+                "application_deadline": now + timedelta(days=30),
+                "employer": "Safaricom",
+                "employer_email": "hr@safaricom.co.ke",
+                "employer_phone": "+254 798765432",
+                "date_posted": now - timedelta(days=i % 30),
+                "is_active": True
+            }
+        }
+        for i in range(count)
+    ]
+
+
+def bench_json():
+    from flask import Flask
+    from flask.json.provider import DefaultJSONProvider
+    from encoders import BACKENDS
+
+    rows = application_rows()
+    print(f"Encoding {len(rows)} application rows:")
+    flask_default = DefaultJSONProvider(Flask(__name__))
+    baseline = report("flask default provider (jsonify)", lambda: flask_default.dumps(rows))
+    for name, (dumps, _) in BACKENDS.items():
+        took = report(f"encoders backend '{name}'", lambda: dumps(rows))
+        print(f"  {'':<40} {baseline / took:9.1f}x")
+
+
+# Builds a throwaway in-memory database holding `count` random job postings
+def job_database(count):
+    from sqlalchemy import create_engine, insert
+    from models import db, Job
+    import importlib
+
+    # Imported for its side effect: it registers the jobs_fts DDL on the jobs table
+    importlib.import_module('search')
+
+    engine = create_engine('sqlite://')
+    db.metadata.create_all(engine)
+    rng = random.Random(42)
+    # A few hundred common words plus a long tail, roughly like real postings
+    vocabulary = [f"word{i}" for i in range(5000)] + [
+        "python", "java", "sql", "marketing", "design", "data", "cloud", "sales",
+        "finance", "nursing", "teaching", "logistics", "security", "mobile", "analytics"]
+    cum_weights = list(itertools.accumulate(1.0 / rank for rank in range(len(vocabulary), 0, -1)))
+    # A few hundred skills, the named ones most in demand
+    skills = vocabulary[:-16:-1] + [f"skill{i}" for i in range(285)]
+    skill_weights = list(itertools.accumulate(1.0 / rank for rank in range(1, len(skills) + 1)))
+    towns = ["Nairobi", "Mombasa", "Kisumu", "Nakuru", "Eldoret", "Remote"]
+    types = ['Full-time', 'Part-time', 'Contract', 'Internship', 'Temporary']
+    now = datetime.utcnow()
+    rows = [
+        {
+            "title": f"{rng.choice(vocabulary[-15:]).title()} {rng.choice(['Engineer', 'Analyst', 'Manager', 'Officer'])}",
+            "description": " ".join(rng.choices(vocabulary, cum_weights=cum_weights, k=40)),
+            "location": f"{rng.choice(towns)}, Kenya",
+            "salary_min": rng.randrange(300000, 900000, 10000),
+            "salary_max": rng.randrange(900000, 2000000, 10000),
+            "job_type": rng.choice(types),
+            "skills_required": ", ".join(rng.choices(skills, cum_weights=skill_weights, k=rng.randint(3, 6))).title(),
+            "benefits": "Health insurance, Paid time off",
+            "application_deadline": now + timedelta(days=rng.randint(-30, 90)),
+            "employer": f"Employer {rng.randrange(2000)}",
+            "employer_email": f"hr{i % 2000}@example.co.ke",
+            "date_posted": now - timedelta(minutes=i),
+            "is_active": rng.random() > 0.1,
+        }
+        for i in range(count)
+    ]
+    with engine.begin() as conn:
+        conn.execute(insert(Job.__table__), rows)
+    return engine
+
+
+def bench_search():
+    from search import SEARCH_SQL, match_expression, FTS_COLUMNS
+
+    engine = job_database(100000)
+    print("Searching 100000 job postings:")
+    with engine.connect() as conn:
+        for q in ["python", "python engineer nairobi", "analyt", "word77 nursing", "kubernetes"]:
+            params = {'match': match_expression(q), 'open_mark': '<mark>', 'close_mark': '</mark>',
+                      'limit': 21, 'offset': 0}
+            report(f"fts5 '{q}'", lambda: conn.execute(SEARCH_SQL, params).all(), number=20)
+        like = " OR ".join(f"{column} LIKE :pattern" for column in FTS_COLUMNS)
+        scan = text(f"SELECT id FROM jobs WHERE {like} LIMIT 21")
+        # What a LIKE fallback costs for a rare term: a scan of every posting
+        report("LIKE '%kubernetes%'", lambda: conn.execute(scan, {'pattern': '%kubernetes%'}).all(), number=5)
+
+
+def bench_match():
+    from sqlalchemy import select
+    from models import Job
+    from skills import SkillIndex, tokenize_skills
+
+    engine = job_database(10000)
+    index = SkillIndex()
+    with engine.connect() as conn:
+        rows = conn.execute(select(
+            Job.id, Job.title, Job.employer, Job.location, Job.skills_required, Job.application_deadline
+        )).mappings().all()
+    for row in rows:
+        index._add(row['id'], row)
+    index.loaded = True
+    index.load = lambda: None
+
+    print(f"Matching against {len(index.jobs)} open jobs:")
+    for skills in ["Python, Sql, Data", "Nursing, Skill12", "Python, Java, Sql, Cloud, Design, Mobile"]:
+        candidate = tokenize_skills(skills)
+        report(f"top 10 for '{skills}'", lambda: index.match(candidate, k=10), number=200)
+
+
+def bench_similar():
+    from sqlalchemy import select
+    from models import Job
+    import numpy as np
+    import similar
+    import tempfile
+
+    engine = job_database(20000)
+    with engine.connect() as conn:
+        rows = conn.execute(select(Job.id, Job.title, Job.skills_required, Job.description)).mappings().all()
+
+    print(f"Similar jobs over {len(rows)} postings:")
+    vectors = []
+    report("vectorize all postings", lambda: vectors.append([similar.job_vector(row) for row in rows]), number=1, repeat=1)
+
+    index = similar.SimilarJobs()
+    index.path = os.path.join(tempfile.mkdtemp(), 'similar_jobs')
+    index._create(index.path, np.array([row['id'] for row in rows]), np.array(vectors[0]))
+    report("open shared matrix (mmap)", index._open, number=20)
+    report("derive idf and norms", lambda: (setattr(index, 'version', None), index._refresh()), number=5)
+    index.load = lambda: None
+    report("top 10 similar for one job", lambda: index.similar(rows[0]['id'], 10), number=50)
+    changed = {rows[1]['id']: dict(rows[1], is_active=True)}
+    report("patch one posting", lambda: index._patch(changed), number=50)
+
+
+def bench_autocomplete():
+    from sqlalchemy import select
+    from models import Job
+    from autocomplete import Autocomplete
+
+    engine = job_database(100000)
+    with engine.connect() as conn:
+        rows = conn.execute(select(Job.id, Job.title, Job.employer)).all()
+
+    index = Autocomplete()
+    index.load = lambda: None
+    def load():
+        index.__init__()
+        for job_id, title, employer in rows:
+            index._add_job(job_id, title, employer, 1)
+        index.version = 0
+        index.loaded = True
+    print(f"Autocomplete over {len(rows)} postings:")
+    report("build index", load, number=1)
+    for q in ["p", "py", "pyth", "employer 1", "employer 123", "officer"]:
+        report(f"suggest '{q}' (cold)", lambda: (index.top_cache.clear(), index.suggest(q)), number=200)
+    report("suggest 'p' (cached)", lambda: index.suggest("p"), number=1000)
+    report("new posting", lambda: index.apply({10 ** 7: {'title': 'Pythonista', 'employer': 'New Co'}}), number=200)
+
+
+def bench_facets():
+    from sqlalchemy import select, func
+    from models import Job
+    from facets import salary_bucket
+
+    engine = job_database(100000)
+    bucket = salary_bucket().label('salary_bucket')
+    print("Facet counts over 100000 postings:")
+    with engine.connect() as conn:
+        for label, where in [("no filter", ()), ("location filter", (Job.location == 'Nairobi, Kenya',)),
+                             ("location + job_type", (Job.location == 'Nairobi, Kenya', Job.job_type == 'Contract'))]:
+            cube = select(Job.job_type, Job.location, bucket, func.count()).where(*where).group_by(Job.job_type, Job.location, bucket)
+            separate = [
+                select(Job.job_type, func.count()).where(*where).group_by(Job.job_type),
+                select(Job.location, func.count()).where(*where).group_by(Job.location),
+                select(bucket, func.count()).where(*where).group_by(bucket),
+            ]
+            report(f"{label}: three GROUP BY queries", lambda: [conn.execute(query).all() for query in separate], number=5)
+            report(f"{label}: one pass over all facets", lambda: conn.execute(cube).all(), number=5)
+
+
+# Reads the seeded database (python -c "import seed; seed.seed_data()")
+def bench_etag():
+    from app import create_app
+    from cache import response_cache
+
+    client = create_app().test_client()
+    for path in ('/get_jobs?limit=200', '/get_job_resources'):
+        etag = client.get(path).headers['ETag']
+        print(f"{path} ({len(client.get(path).data)} bytes):")
+        response_cache.enabled = False
+        report("full response", lambda: client.get(path), number=200)
+        response_cache.enabled = True
+        report("response cache hit", lambda: client.get(path), number=200)
+        report("If-None-Match -> 304", lambda: client.get(path, headers={'If-None-Match': etag}), number=200)
+
+
+# Latency of the update/delete endpoints for a parent row with n children, on
+# a scratch database file (so commits pay for the fsync they would in production)
+def bench_writes():
+    import tempfile
+    import time
+    from sqlalchemy import insert
+    from models import db, User, Job, JobApplication, Payment, ExtraResource
+
+    from app import create_app
+
+    deadline = datetime.utcnow() + timedelta(days=90)
+    with tempfile.TemporaryDirectory() as path:
+        scratch = create_app({
+            'SQLALCHEMY_DATABASE_URI': f'sqlite:///{path}/bench.db',
+            'SIMILAR_JOBS_PATH': os.path.join(path, 'similar_jobs'),
+        })
+        client = scratch.test_client()
+        headers = admin_headers(scratch)
+        with scratch.app_context():
+            db.create_all()
+            for children in (0, 10, 100, 1000):
+                user_id = db.session.execute(insert(User).returning(User.id), {
+                    'username': f'bench_user_{children}', 'email': f'bench{children}@example.com',
+                    'password_hash': 'x', 'role': 'graduate',
+                }).scalar()
+                job_id = db.session.execute(insert(Job).returning(Job.id), {
+                    'title': 'Bench Job', 'description': 'Benchmark posting', 'location': 'Remote',
+                    'job_type': 'Full-time', 'application_deadline': deadline, 'employer': 'Bench',
+                    'employer_email': 'bench@example.com',
+                }).scalar()
+                resource_ids = db.session.scalars(insert(ExtraResource).returning(ExtraResource.id), [
+                    {'job_id': job_id, 'resource_name': f'Guide {i}', 'resource_type': 'Document'} for i in range(6)
+                ]).all()
+                if children:
+                    db.session.execute(insert(JobApplication), [{'user_id': user_id, 'job_id': job_id, 'status': 'pending'}] * children)
+                    db.session.execute(insert(Payment), [{'user_id': user_id, 'amount': 5000}] * children)
+                db.session.commit()
+
+                print(f"{children} applications and payments:")
+                report("PUT /update_user", lambda: client.put(
+                    f'/update_user/{user_id}', json={'phone': '0700000000'}, headers=headers
+                ), number=5)
+                report("PUT /update_job_resource (job fields)", lambda: client.put(
+                    f'/update_job_resource/{resource_ids[0]}', json={'job_id': job_id, 'job_title': 'Bench Job'}
+                ), number=5)
+                timings = []
+                for resource_id in resource_ids[1:]:
+                    start = time.perf_counter()
+                    client.delete(f'/delete_job_resource/{resource_id}')
+                    timings.append(time.perf_counter() - start)
+                print(f"  {'DELETE /delete_job_resource':<40} {min(timings) * 1000:9.2f} ms")
+                start = time.perf_counter()
+                status = client.delete(f'/delete_user/{user_id}').status_code
+                print(f"  {'DELETE /delete_user':<40} {(time.perf_counter() - start) * 1000:9.2f} ms ({status})")
+                db.session.rollback()
+
+
+# Mixed readers and writers on one database file, with SQLite's defaults and
+# with the profile from sqlite_profile.py
+def bench_concurrency(readers=8, writers=2, seconds=3):
+    import tempfile
+    import threading
+    import time
+    from sqlalchemy import create_engine, select, update
+    from sqlalchemy.exc import OperationalError
+    from models import Job
+    from config import Config, engine_options
+    from sqlite_profile import SQLITE_PRAGMAS, apply_pragmas
+
+    source = job_database(20000)
+    print(f"{readers} readers (one page of /get_jobs each) and {writers} writers (one job update per commit), {seconds}s:")
+    for label, pragmas, pooled in [("SQLite defaults", {}, False), ("sqlite_profile", SQLITE_PRAGMAS, True)]:
+        with tempfile.TemporaryDirectory() as path:
+            url = f'sqlite:///{path}/bench.db'
+            engine = create_engine(url, **(engine_options(url, vars(Config)) if pooled else {}))
+            if pragmas:
+                apply_pragmas(engine, pragmas)
+            with source.connect() as conn, engine.connect() as target:
+                conn.connection.driver_connection.backup(target.connection.driver_connection)
+
+            counts = {'reads': 0, 'writes': 0, 'locked': 0}
+            latencies = []
+            lock = threading.Lock()
+            stop = time.monotonic() + seconds
+            page = select(Job.id, Job.title, Job.employer, Job.location).order_by(Job.date_posted.desc(), Job.id.desc()).limit(50)
+
+            def read():
+                while time.monotonic() < stop:
+                    start = time.perf_counter()
+                    with engine.connect() as conn:
+                        conn.execute(page).all()
+                    with lock:
+                        counts['reads'] += 1
+                        latencies.append(time.perf_counter() - start)
+
+            def write(seed):
+                rng = random.Random(seed)
+                while time.monotonic() < stop:
+                    try:
+                        with engine.begin() as conn:
+                            conn.execute(update(Job).where(Job.id == rng.randint(1, 20000)).values(is_active=rng.random() > 0.1))
+                        with lock:
+                            counts['writes'] += 1
+                    except OperationalError:
+                        with lock:
+                            counts['locked'] += 1
+
+            threads = [threading.Thread(target=read) for _ in range(readers)]
+            threads += [threading.Thread(target=write, args=(i,)) for i in range(writers)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            engine.dispose()
+
+            latencies.sort()
+            p99 = latencies[int(len(latencies) * 0.99)] * 1000 if latencies else float('nan')
+            print(f"  {label:<18} {counts['reads'] / seconds:8.0f} reads/s  {counts['writes'] / seconds:6.0f} writes/s  "
+                  f"{counts['locked']} locked errors  read p99 {p99:.2f} ms")
+
+
+# Reporting reads (/get_applications) alongside user writes (/update_user), all
+# on the primary and with the reports routed to a SQLite replica copy
+def bench_replica(reporters=4, writers=2, seconds=3):
+    import tempfile
+    import threading
+    import time
+    from sqlalchemy import event, insert
+    from models import db, User, Job, JobApplication
+    from app import create_app
+    from replica import replicas
+
+    deadline = datetime.utcnow() + timedelta(days=90)
+    print(f"{reporters} reporting clients (/get_applications, 5000 rows) and {writers} writers (/update_user), {seconds}s:")
+    for label, replica in [("primary only", False), ("replica reads", True)]:
+        with tempfile.TemporaryDirectory() as path:
+            config = {
+                'SQLALCHEMY_DATABASE_URI': f'sqlite:///{path}/bench.db',
+                'SIMILAR_JOBS_PATH': os.path.join(path, 'similar_jobs'),
+                # Every writer thread shares the test client's address
+                'REPLICA_STICKY_SECONDS': 0,
+            }
+            if replica:
+                config['DATABASE_REPLICA_URL'] = f'sqlite:///{path}/replica.db'
+            scratch = create_app(config)
+            with scratch.app_context():
+                db.create_all()
+                db.session.execute(insert(User), [{
+                    'username': f'user{i}', 'email': f'user{i}@example.com', 'password_hash': 'x', 'role': 'graduate',
+                } for i in range(500)])
+                db.session.execute(insert(Job), [{
+                    'title': f'Job {i}', 'description': 'Benchmark posting', 'location': 'Remote',
+                    'job_type': 'Full-time', 'application_deadline': deadline, 'employer': 'Bench',
+                    'employer_email': 'bench@example.com',
+                } for i in range(100)])
+                db.session.execute(insert(JobApplication), [
+                    {'user_id': i % 500 + 1, 'job_id': i % 100 + 1, 'status': 'pending'} for i in range(5000)
+                ])
+                db.session.commit()
+                if replica:
+                    replicas.refresh()
+                engines = dict(db.engines)
+
+            reports, writes = [], []
+            # Statements run per engine
+            statements = {}
+            for key, engine in engines.items():
+                statements[key] = 0
+                event.listen(engine, 'before_cursor_execute', lambda *args, key=key: statements.update({key: statements[key] + 1}))
+            lock = threading.Lock()
+            stop = time.monotonic() + seconds
+
+            def run(samples, call):
+                client = scratch.test_client()
+                while time.monotonic() < stop:
+                    start = time.perf_counter()
+                    call(client)
+                    with lock:
+                        samples.append(time.perf_counter() - start)
+
+            rng = random.Random(0)
+            headers = admin_headers(scratch)
+            threads = [threading.Thread(target=run, args=(reports, lambda client: client.get('/get_applications', headers=headers)))
+                       for _ in range(reporters)]
+            threads += [threading.Thread(target=run, args=(writes, lambda client: client.put(
+                f'/update_user/{rng.randint(1, 500)}', json={'phone': '0700000000'}, headers=headers
+            ))) for _ in range(writers)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            with scratch.app_context():
+                for engine in db.engines.values():
+                    engine.dispose()
+
+            writes.sort()
+            p99 = writes[int(len(writes) * 0.99)] * 1000 if writes else float('nan')
+            print(f"  {label:<14} {len(reports) / seconds:6.1f} reports/s  {len(writes) / seconds:7.1f} writes/s  "
+                  f"write p99 {p99:6.2f} ms  statements: {statements[None]} primary, {statements.get('replica', 0)} replica")
+
+
+# A burst of logins alongside other traffic (/get_users), with the password
+# hash on the request thread and in the worker pool from passwords.py
+def bench_login(logins=16, others=2, seconds=5):
+    import tempfile
+    import threading
+    import time
+    from werkzeug.security import generate_password_hash
+    from models import db, User
+    from app import create_app
+    from passwords import passwords
+
+    def p99(samples):
+        samples = sorted(samples)
+        return samples[int(len(samples) * 0.99)] * 1000 if samples else float('nan')
+
+    print(f"{logins} clients logging in and {others} clients reading /get_users, {seconds}s, {os.cpu_count()} CPUs:")
+    for label, workers in [("request thread", 0), ("worker pool", 2)]:
+        with tempfile.TemporaryDirectory() as path:
+            scratch = create_app({
+                'SQLALCHEMY_DATABASE_URI': f'sqlite:///{path}/bench.db',
+                'SIMILAR_JOBS_PATH': os.path.join(path, 'similar_jobs'),
+                'PASSWORD_WORKERS': workers,
+            })
+            with scratch.app_context():
+                db.create_all()
+                db.session.add_all(User(
+                    username=f'user{i}', email=f'user{i}@example.com', role='graduate',
+                    password_hash=generate_password_hash('bench-password', method=scratch.config['PASSWORD_HASH_METHOD']),
+                ) for i in range(50))
+                db.session.commit()
+            # Start the workers outside the timed run
+            passwords.hash('warm-up')
+
+            headers = admin_headers(scratch)
+            samples = {'login': [], 'other': [], 'rejected': 0}
+            lock = threading.Lock()
+            stop = time.monotonic() + seconds
+
+            def login(number):
+                client = scratch.test_client()
+                while time.monotonic() < stop:
+                    start = time.perf_counter()
+                    status = client.post('/login', json={'email': f'user{number % 50}@example.com', 'password': 'bench-password'}).status_code
+                    with lock:
+                        if status == 429:
+                            samples['rejected'] += 1
+                        else:
+                            samples['login'].append(time.perf_counter() - start)
+                    if status == 429:
+                        time.sleep(0.05)
+
+            def other():
+                client = scratch.test_client()
+                while time.monotonic() < stop:
+                    start = time.perf_counter()
+                    client.get('/get_users', headers=headers)
+                    with lock:
+                        samples['other'].append(time.perf_counter() - start)
+
+            threads = [threading.Thread(target=login, args=(i,)) for i in range(logins)]
+            threads += [threading.Thread(target=other) for _ in range(others)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            passwords.shutdown()
+
+            print(f"  {label:<15} logins {len(samples['login']) / seconds:5.1f}/s p99 {p99(samples['login']):7.1f} ms "
+                  f"({samples['rejected']} rejected)   /get_users {len(samples['other']) / seconds:6.1f}/s p99 {p99(samples['other']):7.1f} ms")
+
+
+# Authorization cost per request: verifying the JWT and loading the user on
+# every request, against roles_required with its token cache and revocation
+# filter
+def bench_auth(number=20000):
+    import tempfile
+    import uuid
+    from flask_jwt_extended import verify_jwt_in_request, get_jwt_identity
+    from models import db, User
+    from app import create_app
+    from auth import auth, roles_required, BloomFilter
+    from cache import LocalBackend
+
+    def timed(label, func):
+        best = min(timeit.repeat(func, number=number, repeat=3)) / number
+        print(f"  {label:<44} {best * 1e6:8.1f} us")
+
+    with tempfile.TemporaryDirectory() as path:
+        scratch = create_app({
+            'SQLALCHEMY_DATABASE_URI': f'sqlite:///{path}/bench.db',
+            'SIMILAR_JOBS_PATH': os.path.join(path, 'similar_jobs'),
+        })
+        with scratch.app_context():
+            db.create_all()
+            db.session.add(User(username='admin', email='admin@example.com', password_hash='x', role='admin'))
+            db.session.commit()
+        headers = admin_headers(scratch)
+
+        def lookup_user():
+            verify_jwt_in_request()
+            user = db.session.get(User, int(get_jwt_identity()))
+            db.session.expunge(user)
+            return user.role == 'admin'
+
+        checked = roles_required('admin')(lambda: True)
+        with scratch.test_request_context('/get_users', headers=headers):
+            print(f"Authorization per request ({number} requests):")
+            timed("verify JWT + load user", lookup_user)
+            tokens = auth.tokens
+            auth.tokens = LocalBackend(0)
+            timed("roles_required, token not cached", checked)
+            auth.tokens = tokens
+            timed("roles_required, token cached", checked)
+
+            # A revoked token is found in the filter, then confirmed in the table
+            auth.revocations.revoke(auth.principal())
+            timed("roles_required, revoked token", checked)
+            db.session.rollback()
+
+    capacity = 100000
+    bloom = BloomFilter(capacity, 0.001)
+    for _ in range(capacity):
+        bloom.add(str(uuid.uuid4()))
+    false_positives = sum(str(uuid.uuid4()) in bloom for _ in range(capacity))
+    print(f"Bloom filter with {capacity} revoked tokens: {len(bloom.bits) / 1024:.0f} KB, "
+          f"{bloom.hashes} hashes, {false_positives / capacity:.4%} false positives (target 0.1%)")
+
+
+# Concurrent clients against the sync deployment (threaded Werkzeug server)
+# and the ASGI one (uvicorn + asgi.py), each in its own process, with the
+# response cache off so every request reads the database
+SERVERS = {
+    'sync (werkzeug threads)': (
+        "from werkzeug.serving import make_server\n"
+        "from app import create_app\n"
+        "import logging\n"
+        "logging.getLogger('werkzeug').setLevel(logging.WARNING)\n"
+        "make_server('127.0.0.1', {port}, create_app({config!r}), threaded=True).serve_forever()\n"
+    ),
+    'async (uvicorn + asgi.py)': (
+        "import uvicorn\n"
+        "from asgi import create_asgi_app\n"
+        "uvicorn.run(create_asgi_app({config!r}), host='127.0.0.1', port={port}, log_level='warning')\n"
+    ),
+}
+
+
+def bench_asgi(clients=32, seconds=5, port=8731):
+    import subprocess
+    import tempfile
+    import threading
+    import time
+    import urllib.request
+    from sqlalchemy import create_engine
+
+    source = job_database(20000)
+    towns = ["Nairobi", "Mombasa", "Kisumu", "Nakuru", "Eldoret", "Remote"]
+    print(f"{clients} concurrent clients, /get_jobs (filtered page of 50) and /get_job, {seconds}s, {os.cpu_count()} CPUs:")
+    for label, script in SERVERS.items():
+        with tempfile.TemporaryDirectory() as path:
+            engine = create_engine(f'sqlite:///{path}/bench.db')
+            with source.connect() as conn, engine.connect() as target:
+                conn.connection.driver_connection.backup(target.connection.driver_connection)
+            engine.dispose()
+
+            config = {
+                'SQLALCHEMY_DATABASE_URI': f'sqlite:///{path}/bench.db',
+                'SIMILAR_JOBS_PATH': os.path.join(path, 'similar_jobs'),
+                'CACHE_BACKEND': 'none',
+            }
+            server = subprocess.Popen([sys.executable, '-c', script.format(port=port, config=config)])
+            try:
+                deadline = time.monotonic() + 30
+                while True:
+                    try:
+                        urllib.request.urlopen(f'http://127.0.0.1:{port}/get_job?job_id=1').read()
+                        break
+                    except OSError:
+                        if time.monotonic() > deadline:
+                            raise
+                        time.sleep(0.2)
+
+                latencies, errors = [], []
+                lock = threading.Lock()
+                stop = time.monotonic() + seconds
+
+                def client(seed):
+                    rng = random.Random(seed)
+                    while time.monotonic() < stop:
+                        if rng.random() < 0.5:
+                            url = f'/get_jobs?limit=50&location={rng.choice(towns)},%20Kenya&open=true'
+                        else:
+                            url = f'/get_job?job_id={rng.randint(1, 20000)}'
+                        start = time.perf_counter()
+                        try:
+                            urllib.request.urlopen(f'http://127.0.0.1:{port}{url}', timeout=30).read()
+                        except OSError as e:
+                            with lock:
+                                errors.append(e)
+                            continue
+                        with lock:
+                            latencies.append(time.perf_counter() - start)
+
+                threads = [threading.Thread(target=client, args=(i,)) for i in range(clients)]
+                for thread in threads:
+                    thread.start()
+                for thread in threads:
+                    thread.join()
+            finally:
+                server.terminate()
+                server.wait()
+
+            latencies.sort()
+            p50 = latencies[len(latencies) // 2] * 1000 if latencies else float('nan')
+            p99 = latencies[int(len(latencies) * 0.99)] * 1000 if latencies else float('nan')
+            print(f"  {label:<26} {len(latencies) / seconds:7.1f} req/s  p50 {p50:7.1f} ms  p99 {p99:7.1f} ms  {len(errors)} errors")
+
+
+# Private memory of this process (pages not shared with its parent), in MB
+def private_mb():
+    with open('/proc/self/smaps_rollup') as f:
+        fields = dict(line.split(':', 1) for line in f if line.startswith('Private_'))
+    return sum(int(value.split()[0]) for value in fields.values()) / 1024
+
+
+# A pre-fork server with and without prefork.preload(): the server process
+# builds the app and forks `workers` workers, which each answer their first
+# requests to the index-backed endpoints at once. Linux only (os.fork, /proc)
+def bench_startup(workers=4):
+    import json
+    import tempfile
+    import time
+    from sqlalchemy import create_engine
+
+    paths = ('/match_jobs?skills=Python, SQL', '/autocomplete?q=py', '/similar_jobs?job_id=1')
+    source = job_database(20000)
+    print(f"{workers} forked workers, first requests to {', '.join(path.split('?')[0] for path in paths)}:")
+    for preload in (False, True):
+        with tempfile.TemporaryDirectory() as path:
+            engine = create_engine(f'sqlite:///{path}/bench.db')
+            with source.connect() as conn, engine.connect() as target:
+                conn.connection.driver_connection.backup(target.connection.driver_connection)
+            engine.dispose()
+            config = {
+                'SQLALCHEMY_DATABASE_URI': f'sqlite:///{path}/bench.db',
+                'SIMILAR_JOBS_PATH': os.path.join(path, 'similar_jobs'),
+                'CACHE_BACKEND': 'none',
+            }
+
+            # Each server runs in a fresh fork of this process, so nothing is
+            # loaded before it starts; the shared matrix files are built first
+            def forked(func):
+                pid = os.fork()
+                if pid == 0:
+                    try:
+                        func()
+                    finally:
+                        os._exit(0)
+                os.waitpid(pid, 0)
+
+            def build_matrix():
+                from app import create_app
+                from similar import similar_jobs
+                with create_app(config).app_context():
+                    similar_jobs.rebuild()
+
+            readout, writeout = os.pipe()
+
+            def server():
+                from app import create_app
+                from prefork import prefork
+                start = time.perf_counter()
+                app = create_app(config)
+                if preload:
+                    prefork.preload(app)
+                setup = time.perf_counter() - start
+                children = []
+                for _ in range(workers):
+                    pid = os.fork()
+                    if pid == 0:
+                        try:
+                            client = app.test_client()
+                            start = time.perf_counter()
+                            for url in paths:
+                                assert client.get(url).status_code == 200, url
+                            first = time.perf_counter() - start
+                            line = json.dumps({'setup': setup, 'first': first, 'private': private_mb()})
+                            os.write(writeout, line.encode() + b'\n')
+                        finally:
+                            os._exit(0)
+                    children.append(pid)
+                for pid in children:
+                    os.waitpid(pid, 0)
+
+            forked(build_matrix)
+            forked(server)
+            os.close(writeout)
+            with os.fdopen(readout) as lines:
+                results = [json.loads(line) for line in lines]
+
+        label = "preloaded in the server process" if preload else "built by each worker"
+        first = sum(result['first'] for result in results) / len(results)
+        private = sum(result['private'] for result in results) / len(results)
+        print(f"  {label:<34} server setup {results[0]['setup'] * 1000:7.1f} ms  "
+              f"worker first requests {first * 1000:7.1f} ms  private {private:6.1f} MB/worker")
+
+
+BENCHMARKS = {
+    'json': bench_json,
+    'search': bench_search,
+    'match': bench_match,
+    'similar': bench_similar,
+    'autocomplete': bench_autocomplete,
+    'facets': bench_facets,
+    'etag': bench_etag,
+    'writes': bench_writes,
+    'concurrency': bench_concurrency,
+    'replica': bench_replica,
+    'login': bench_login,
+    'auth': bench_auth,
+    'asgi': bench_asgi,
+    'startup': bench_startup,
+}
+
+if __name__ == "__main__":
+    for name in sys.argv[1:] or BENCHMARKS:
+        BENCHMARKS[name]()
@@ -0,0 +1,308 @@
+from sqlalchemy import inspect, insert, select, update
+from hooks import record_change
+from models import db, User, Job, JobApplication
+from datetime import datetime
+import json
+
+# Bulk ingest for partner feeds. Uploads are a JSON array or NDJSON (one
+# object per line); rows are checked one by one and written a chunk at a time,
+# one executemany statement and one transaction per chunk. A bad row is
+# reported and skipped, it doesn't fail the rest of the upload
+CHUNK_SIZE = 1000
+MAX_ERRORS = 1000
+
+JOB_REQUIRED = ('title', 'description', 'location', 'job_type', 'application_deadline', 'employer', 'employer_email')
+JOB_OPTIONAL = ('salary_min', 'salary_max', 'skills_required', 'benefits', 'employer_phone', 'is_active', 'external_id')
+APPLICATION_FIELDS = ('user_id', 'job_id', 'status', 'application_date')
+# Status updates bind every id into one statement; SQLite allows 32766 parameters
+MAX_STATUS_IDS = 10000
+
+
+# Yields (row number, row) pairs, with a ValueError as the row for lines that
+# aren't valid JSON. NDJSON is read line by line from the request stream
+def read_rows(request):
+    if request.mimetype in ('application/x-ndjson', 'application/jsonl'):
+        for number, line in enumerate(request.stream, 1):
+            if not line.strip():
+                continue
+            try:
+                yield number, json.loads(line)
+            except ValueError:
+                yield number, ValueError("Invalid JSON.")
+        return
+
+    rows = request.get_json(silent=True)
+    if not isinstance(rows, list):
+        raise ValueError("Expected a JSON array of objects or an NDJSON (application/x-ndjson) upload.")
+    yield from enumerate(rows, 1)
+
+
+def chunked(rows, size=CHUNK_SIZE):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def parse_datetime(value, name):
+    if isinstance(value, str):
+        try:
+            return datetime.fromisoformat(value)
+        except ValueError:
+            pass
+    raise ValueError(f"{name} must be an ISO date or datetime (e.g., 2025-06-30T17:00:00).")
+
+
+# Column values for one job row, checked with the Job validators
+def job_values(data):
+    if not isinstance(data, dict):
+        raise ValueError("Each row must be a JSON object.")
+    missing = [name for name in JOB_REQUIRED if data.get(name) in (None, '')]
+    if missing:
+        raise ValueError(f"Missing required fields: {', '.join(missing)}.")
+    unknown = set(data) - set(JOB_REQUIRED) - set(JOB_OPTIONAL)
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}.")
+
+    values = {name: data.get(name) for name in JOB_REQUIRED + JOB_OPTIONAL}
+    values['application_deadline'] = parse_datetime(values['application_deadline'], 'application_deadline')
+    for name in ('salary_min', 'salary_max'):
+        if values[name] is not None:
+            if isinstance(values[name], bool) or not isinstance(values[name], (int, float)):
+                raise ValueError(f"{name} must be a number.")
+            values[name] = float(values[name])
+    if values['is_active'] is None:
+        values['is_active'] = True
+    elif not isinstance(values['is_active'], bool):
+        raise ValueError("is_active must be true or false.")
+    if values['external_id'] is not None:
+        values['external_id'] = str(values['external_id'])
+
+    return validate(Job, values)
+
+
+# Runs the model's own @validates methods on plain values, without building
+# an instance
+def validate(model, values):
+    for name, (validator, _) in inspect(model).validators.items():
+        if name in values:
+            values[name] = validator(None, name, values[name])
+    return values
+
+
+class BulkResult:
+    def __init__(self):
+        self.created = 0
+        self.updated = 0
+        self.failed = 0
+        self.errors = []
+
+    def error(self, number, message):
+        self.failed += 1
+        if len(self.errors) < MAX_ERRORS:
+            self.errors.append({"row": number, "error": message})
+
+    def to_dict(self):
+        return {
+            "created": self.created,
+            "updated": self.updated,
+            "failed": self.failed,
+            # Only the first MAX_ERRORS errors are listed
+            "errors": self.errors,
+        }
+
+
+# For the smaller batches that report every item: one entry per row, in order
+class ItemizedResult(BulkResult):
+    def __init__(self):
+        super().__init__()
+        self.items = {}
+
+    def error(self, number, message):
+        self.failed += 1
+        self.items[number] = {"row": number, "error": message}
+
+    def done(self, number, outcome, **fields):
+        if outcome in ('created', 'updated'):
+            setattr(self, outcome, getattr(self, outcome) + 1)
+        self.items[number] = {"row": number, "result": outcome, **fields}
+
+    def to_dict(self):
+        return {
+            "created": self.created,
+            "updated": self.updated,
+            "failed": self.failed,
+            "results": [self.items[number] for number in sorted(self.items)],
+        }
+
+
+# Inserts new jobs and updates the ones whose external_id already exists
+def ingest_jobs(rows):
+    result = BulkResult()
+    seen = set()
+
+    def valid_rows():
+        for number, data in rows:
+            if isinstance(data, ValueError):
+                result.error(number, str(data))
+                continue
+            try:
+                values = job_values(data)
+            except (ValueError, TypeError) as e:
+                result.error(number, str(e))
+                continue
+            key = values['external_id']
+            if key is not None:
+                if key in seen:
+                    result.error(number, f"Duplicate external_id '{key}' in this upload.")
+                    continue
+                seen.add(key)
+            yield number, values
+
+    for chunk in chunked(valid_rows()):
+        try:
+            created, updated = _write_jobs(chunk)
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            for number, _ in chunk:
+                result.error(number, str(e))
+            continue
+        result.created += created
+        result.updated += updated
+    return result
+
+
+def _write_jobs(chunk):
+    keys = [values['external_id'] for _, values in chunk if values['external_id'] is not None]
+    existing = dict(db.session.execute(
+        select(Job.external_id, Job.id).where(Job.external_id.in_(keys))
+    ).all()) if keys else {}
+
+    now = datetime.utcnow()
+    inserts = [dict(values, date_posted=now) for _, values in chunk if values['external_id'] not in existing]
+    updates = [dict(values, id=existing[values['external_id']]) for _, values in chunk if values['external_id'] in existing]
+
+    if inserts:
+        # Returning whole rows means they don't have to come back in order,
+        # which lets SQLite take many rows per INSERT statement
+        created = db.session.execute(insert(Job).returning(*Job.__table__.columns), inserts).all()
+        for row in created:
+            record_change(db.session, 'jobs', row.id, row._asdict())
+    if updates:
+        db.session.execute(update(Job), updates)
+        # date_posted keeps its original value and isn't part of the change
+        for values in updates:
+            record_change(db.session, 'jobs', values['id'], values)
+    return len(inserts), len(updates)
+
+
+# Column values for one application row, checked with the JobApplication validators
+def application_values(data):
+    if not isinstance(data, dict):
+        raise ValueError("Each row must be a JSON object.")
+    unknown = set(data) - set(APPLICATION_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}.")
+    values = {}
+    for name in ('user_id', 'job_id'):
+        if isinstance(data.get(name), bool) or not isinstance(data.get(name), int):
+            raise ValueError(f"{name} must be an integer.")
+        values[name] = data[name]
+    values['status'] = data.get('status', 'pending')
+    values['application_date'] = parse_datetime(data['application_date'], 'application_date') \
+        if data.get('application_date') else datetime.utcnow()
+    return validate(JobApplication, values)
+
+
+# Creates applications a chunk at a time, checking users and jobs per chunk
+def ingest_applications(rows):
+    result = ItemizedResult()
+
+    def valid_rows():
+        for number, data in rows:
+            if isinstance(data, ValueError):
+                result.error(number, str(data))
+                continue
+            try:
+                yield number, application_values(data)
+            except (ValueError, TypeError) as e:
+                result.error(number, str(e))
+
+    for chunk in chunked(valid_rows()):
+        user_ids = set(db.session.scalars(select(User.id).where(User.id.in_({values['user_id'] for _, values in chunk}))))
+        job_ids = set(db.session.scalars(select(Job.id).where(Job.id.in_({values['job_id'] for _, values in chunk}))))
+        accepted = []
+        for number, values in chunk:
+            if values['user_id'] not in user_ids:
+                result.error(number, f"User with ID {values['user_id']} not found.")
+            elif values['job_id'] not in job_ids:
+                result.error(number, f"Job with ID {values['job_id']} not found.")
+            else:
+                accepted.append((number, values))
+        if not accepted:
+            continue
+
+        try:
+            # Each item reports its new id, so RETURNING has to keep the upload
+            # order. SQLite can only do that one row per statement
+            statement = insert(JobApplication).returning(*JobApplication.__table__.columns, sort_by_parameter_order=True)
+            created = db.session.execute(statement, [values for _, values in accepted]).all()
+            for row in created:
+                record_change(db.session, 'job_applications', row.id, row._asdict())
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            for number, _ in accepted:
+                result.error(number, str(e))
+            continue
+        for (number, _), row in zip(accepted, created):
+            result.done(number, 'created', id=row.id)
+    return result
+
+
+# Moves applications to a new status in one UPDATE. With from_status, only
+# applications currently in that status move (e.g., accept only pending ones)
+def update_application_status(application_ids, status, from_status=None):
+    if not isinstance(application_ids, list) or not all(
+        isinstance(application_id, int) and not isinstance(application_id, bool) for application_id in application_ids
+    ):
+        raise ValueError("application_ids must be a list of integers.")
+    if len(application_ids) > MAX_STATUS_IDS:
+        raise ValueError(f"At most {MAX_STATUS_IDS} application_ids per request.")
+    status = validate(JobApplication, {'status': status})['status']
+    if from_status is not None:
+        from_status = validate(JobApplication, {'status': from_status})['status']
+
+    statement = update(JobApplication).where(
+        JobApplication.id.in_(application_ids), JobApplication.status != status
+    ).values(status=status).returning(*JobApplication.__table__.columns)
+    if from_status is not None:
+        statement = statement.where(JobApplication.status == from_status)
+    changed = db.session.execute(statement, execution_options={'synchronize_session': False}).all()
+    for row in changed:
+        record_change(db.session, 'job_applications', row.id, row._asdict())
+
+    # Why the others didn't move, from one more read
+    current = dict(db.session.execute(
+        select(JobApplication.id, JobApplication.status).where(JobApplication.id.in_(application_ids))
+    ).all())
+    db.session.commit()
+
+    changed = {row.id for row in changed}
+    result = ItemizedResult()
+    for number, application_id in enumerate(application_ids, 1):
+        if application_id in changed:
+            changed.discard(application_id)
+            result.done(number, 'updated', id=application_id, status=status)
+        elif application_id not in current:
+            result.error(number, f"Application with ID {application_id} not found.")
+        elif current[application_id] == status:
+            result.done(number, 'unchanged', id=application_id, status=status)
+        else:
+            result.error(number, f"Application {application_id} is {current[application_id]}, not {from_status}.")
+    return result
@@ -0,0 +1,200 @@
+from flask import current_app, g, request
+from collections import OrderedDict
+from functools import wraps
+from hooks import on_commit
+import inspect
+import pickle
+import threading
+import time
+
+# Response cache for read endpoints. Entries are stored under the endpoint and
+# its query arguments plus the current version of every tag the response
+# depends on ('jobs', 'job:3', ...). A write bumps the versions of the tags it
+# touches, so only responses built from the changed rows stop matching, and
+# nothing has to enumerate keys to invalidate them.
+#
+# Tag versions only move in the process that made the write. Under
+# etags.conditional the key also holds the request's ETag, which is built from
+# the table_versions rows every process bumps, so a write made elsewhere
+# changes the key too, and a cached body never goes out under a newer ETag
+# than the one it was stored with.
+
+
+# In-process LRU with per-entry TTL
+class LocalBackend:
+    def __init__(self, size=1024):
+        self.size = size
+        self.entries = OrderedDict()
+        self.versions = {}
+        self.lock = threading.Lock()
+        self.evictions = 0
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] < time.monotonic():
+                del self.entries[key]
+                self.evictions += 1
+                return None
+            self.entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key, value, ttl):
+        with self.lock:
+            self.entries[key] = (time.monotonic() + ttl, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.size:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def versions_of(self, tags):
+        with self.lock:
+            return [self.versions.get(tag, 0) for tag in tags]
+
+    def bump(self, tags):
+        with self.lock:
+            for tag in tags:
+                self.versions[tag] = self.versions.get(tag, 0) + 1
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.versions.clear()
+
+
+# Shared cache for several worker processes or hosts; needs the redis package
+class RedisBackend:
+    def __init__(self, url, prefix='response_cache:'):
+        import redis
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+        self.evictions = 0
+
+    def get(self, key):
+        value = self.client.get(self.prefix + key)
+        return pickle.loads(value) if value is not None else None
+
+    def set(self, key, value, ttl):
+        self.client.set(self.prefix + key, pickle.dumps(value), ex=ttl)
+
+    def versions_of(self, tags):
+        values = self.client.mget([self.prefix + 'tag:' + tag for tag in tags])
+        return [int(value or 0) for value in values]
+
+    def bump(self, tags):
+        pipeline = self.client.pipeline()
+        for tag in tags:
+            pipeline.incr(self.prefix + 'tag:' + tag)
+        pipeline.execute()
+
+    def clear(self):
+        for key in self.client.scan_iter(self.prefix + '*'):
+            self.client.delete(key)
+
+
+class ResponseCache:
+    def __init__(self):
+        self.backend = LocalBackend()
+        self.ttl = 300
+        self.enabled = True
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def init_app(self, app):
+        app.config.setdefault('CACHE_BACKEND', 'local')
+        app.config.setdefault('CACHE_TTL', 300)
+        app.config.setdefault('CACHE_SIZE', 1024)
+        app.config.setdefault('CACHE_URL', None)
+        self.ttl = app.config['CACHE_TTL']
+        self.enabled = app.config['CACHE_BACKEND'] != 'none'
+        if app.config['CACHE_BACKEND'] == 'redis':
+            self.backend = RedisBackend(app.config['CACHE_URL'])
+        else:
+            self.backend = LocalBackend(app.config['CACHE_SIZE'])
+
+    def _count(self, counter):
+        with self.lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def invalidate(self, *tags):
+        self.backend.bump(tags)
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "backend": type(self.backend).__name__,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.backend.evictions,
+            "hit_rate": round(self.hits / total, 4) if total else None,
+        }
+
+    def _key(self, tags):
+        resolved = [tag(request.args) if callable(tag) else tag for tag in tags]
+        versions = self.backend.versions_of(resolved)
+        return '|'.join([
+            request.path,
+            '&'.join(f'{name}={value}' for name, value in sorted(request.args.items(multi=True))),
+            ','.join(f'{tag}@{version}' for tag, version in zip(resolved, versions)),
+            g.get('etag', ''),
+        ])
+
+    def _lookup(self, key):
+        entry = self.backend.get(key)
+        if entry is None:
+            self._count('misses')
+            return None
+        self._count('hits')
+        body, status, headers = entry
+        return current_app.response_class(body, status=status, headers=headers)
+
+    def _store(self, key, response):
+        if getattr(response, 'status_code', None) == 200:
+            self.backend.set(key, (response.get_data(), 200, list(response.headers.items())), self.ttl)
+        return response
+
+    # Caches successful responses of a Resource method (sync or async). Tags
+    # are strings, or callables taking the request args for tags that depend
+    # on them, e.g.
+    #   @response_cache.cached('jobs', lambda args: f"job:{args.get('job_id')}")
+    def cached(self, *tags):
+        def decorator(method):
+            @wraps(method)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return method(*args, **kwargs)
+                key = self._key(tags)
+                response = self._lookup(key)
+                if response is not None:
+                    return response
+                return self._store(key, method(*args, **kwargs))
+
+            @wraps(method)
+            async def async_wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return await method(*args, **kwargs)
+                key = self._key(tags)
+                response = self._lookup(key)
+                if response is not None:
+                    return response
+                return self._store(key, await method(*args, **kwargs))
+
+            return async_wrapper if inspect.iscoroutinefunction(method) else wrapper
+        return decorator
+
+
+response_cache = ResponseCache()
+
+
+# Writes to jobs or resources invalidate the lists and the changed rows
+@on_commit('jobs')
+def _jobs_changed(rows):
+    response_cache.invalidate('jobs', *(f'job:{job_id}' for job_id in rows))
+
+
+@on_commit('extra_resources')
+def _resources_changed(rows):
+    response_cache.invalidate('extra_resources', *(f'resource:{resource_id}' for resource_id in rows))
@@ -0,0 +1,80 @@
+from sqlalchemy.engine import make_url
+import os
+
+# Settings for create_app(). Database settings come from the environment, so
+# one build runs against the local SQLite file or a PostgreSQL server, e.g.
+#   DATABASE_URL=postgresql+psycopg2://jobs:secret@db/jobs DATABASE_POOL_SIZE=20 flask run
+
+
+def env_int(name, default):
+    value = os.environ.get(name)
+    return int(value) if value not in (None, '') else default
+
+
+class Config:
+    SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL', 'sqlite:///Job.db')
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+    # Read-only copy for reporting queries, bound as 'replica' when set
+    DATABASE_REPLICA_URL = os.environ.get('DATABASE_REPLICA_URL')
+    # Seconds between copies of a SQLite primary onto a SQLite replica file
+    # (0: never; run flask refresh-replica yourself)
+    REPLICA_REFRESH_SECONDS = env_int('REPLICA_REFRESH_SECONDS', 0)
+    # Seconds a client reads from the primary after its own write; keep it
+    # above the replica's lag
+    REPLICA_STICKY_SECONDS = env_int('REPLICA_STICKY_SECONDS', 10)
+    # Connections kept open per process, and how many more a burst may open
+    DATABASE_POOL_SIZE = env_int('DATABASE_POOL_SIZE', 10)
+    DATABASE_MAX_OVERFLOW = env_int('DATABASE_MAX_OVERFLOW', 10)
+    DATABASE_POOL_TIMEOUT = env_int('DATABASE_POOL_TIMEOUT', 10)
+    # Seconds before a connection is replaced; servers drop idle ones (-1: never)
+    DATABASE_POOL_RECYCLE = env_int('DATABASE_POOL_RECYCLE', 1800)
+    # Milliseconds a statement may run before the server cancels it (0: no limit).
+    # PostgreSQL and MySQL only; SQLite has no server to enforce it
+    DATABASE_STATEMENT_TIMEOUT = env_int('DATABASE_STATEMENT_TIMEOUT', 30000)
+
+    SECRET_KEY = os.environ.get('SECRET_KEY', 'your_secret_key')  # Change to a secure key
+    JWT_SECRET_KEY = os.environ.get('JWT_SECRET_KEY', 'your_jwt_secret_key')  # Change to a secure key
+    # Password hashing (passwords.py): werkzeug method string, salt length,
+    # worker processes (0: hash on the request thread), and how many hashes
+    # may be queued or running before /login and /register answer 429
+    PASSWORD_HASH_METHOD = os.environ.get('PASSWORD_HASH_METHOD', 'scrypt:32768:8:1')
+    PASSWORD_SALT_LENGTH = env_int('PASSWORD_SALT_LENGTH', 16)
+    PASSWORD_WORKERS = env_int('PASSWORD_WORKERS', 2)
+    PASSWORD_QUEUE_DEPTH = env_int('PASSWORD_QUEUE_DEPTH', 16)
+    JSON_BACKEND = 'auto'  # 'orjson' when installed, otherwise 'json'
+    CACHE_BACKEND = 'local'  # 'local' (in-process LRU), 'redis' (shared, set CACHE_URL) or 'none'
+    CACHE_TTL = 300
+    # Cold start limits for flask startup-profile --check: importing app.py
+    # plus create_app(), and each first request, in milliseconds
+    STARTUP_BUDGET_MS = env_int('STARTUP_BUDGET_MS', 1000)
+    FIRST_REQUEST_BUDGET_MS = env_int('FIRST_REQUEST_BUDGET_MS', 500)
+
+
+# create_engine() arguments for a database URL under the pool settings in config
+def engine_options(url, config):
+    url = make_url(url)
+    options = {}
+    # In-memory SQLite lives in a single connection, there is no pool to size
+    if not (url.get_backend_name() == 'sqlite' and url.database in (None, '', ':memory:')):
+        options.update(
+            pool_size=config['DATABASE_POOL_SIZE'],
+            max_overflow=config['DATABASE_MAX_OVERFLOW'],
+            pool_timeout=config['DATABASE_POOL_TIMEOUT'],
+            pool_recycle=config['DATABASE_POOL_RECYCLE'],
+        )
+
+    timeout = config['DATABASE_STATEMENT_TIMEOUT']
+    if timeout and url.get_backend_name() == 'postgresql':
+        options['connect_args'] = {'options': f'-c statement_timeout={timeout}'}
+    elif timeout and url.get_backend_name() == 'mysql':
+        options['connect_args'] = {'init_command': f'SET SESSION max_execution_time={timeout}'}
+    return options
+
+
+# Fills in the Flask-SQLAlchemy engine settings from the DATABASE_* ones
+def configure_database(config):
+    config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', engine_options(config['SQLALCHEMY_DATABASE_URI'], config))
+    replica = config.get('DATABASE_REPLICA_URL')
+    if replica:
+        config.setdefault('SQLALCHEMY_BINDS', {})
+        config['SQLALCHEMY_BINDS'].setdefault('replica', dict(engine_options(replica, config), url=replica))
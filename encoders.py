@@ -0,0 +1,82 @@
+from flask import Response
+from flask.json.provider import JSONProvider
+from datetime import date, datetime
+from decimal import Decimal
+import json
+
+try:
+    import orjson
+except ImportError:  # a requirement, but an install without it still runs on the stdlib encoder
+    orjson = None
+
+
+# Datetimes are always written as ISO-8601 (e.g., 2025-05-01T00:00:00),
+# whichever backend does the encoding
+def default(obj):
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    if isinstance(obj, Decimal):
+        return float(obj)
+    raise TypeError(f"Object of type {obj.__class__.__name__} is not JSON serializable")
+
+
+def orjson_dumps(obj):
+    return orjson.dumps(obj, default=default, option=orjson.OPT_NON_STR_KEYS)
+
+
+def stdlib_dumps(obj):
+    return json.dumps(obj, default=default, separators=(',', ':')).encode()
+
+
+# Encoder backends by name; each turns an object into UTF-8 JSON bytes
+BACKENDS = {
+    'json': (stdlib_dumps, json.loads),
+}
+if orjson is not None:
+    BACKENDS['orjson'] = (orjson_dumps, orjson.loads)
+
+
+def get_backend(name='auto'):
+    if name == 'auto':
+        name = 'orjson' if 'orjson' in BACKENDS else 'json'
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown JSON backend '{name}'. Available backends: {', '.join(BACKENDS)}.")
+    return BACKENDS[name]
+
+
+# Flask JSON provider used by jsonify, picks its backend from JSON_BACKEND
+class FastJSONProvider(JSONProvider):
+    mimetype = 'application/json'
+
+    def __init__(self, app):
+        super().__init__(app)
+        self._dumps, self._loads = get_backend(app.config.get('JSON_BACKEND', 'auto'))
+
+    def dumps(self, obj, **kwargs):
+        return self._dumps(obj).decode()
+
+    def loads(self, s, **kwargs):
+        return self._loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(self._dumps(obj), mimetype=self.mimetype)
+
+
+# Registers the provider on the app and as the flask_restful JSON representation
+def init_json(app, api):
+    app.json = FastJSONProvider(app)
+
+    @api.representation('application/json')
+    def output_json(data, code, headers=None):
+        # Resources return jsonify() responses, often paired with a status code
+        if isinstance(data, Response):
+            response = data
+            response.status_code = code
+        else:
+            response = app.json.response(data)
+            response.status_code = code
+        response.headers.extend(headers or {})
+        return response
+
+    return output_json
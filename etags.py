@@ -0,0 +1,102 @@
+from flask import current_app, g, request
+from sqlalchemy import event, insert, select, update
+from functools import wraps
+from hooks import on_write
+from models import db, TableVersion
+import hashlib
+import inspect
+
+# Conditional GETs for polled read endpoints. Every write to a versioned table
+# bumps its row in table_versions inside the same transaction, so the counter
+# moves exactly when committed data does, in every worker process. A response's
+# ETag hashes the request with the versions of the tables it reads; when the
+# client's If-None-Match still matches, the answer is a bare 304 and neither
+# the query nor the serialization runs.
+VERSIONED_TABLES = ('jobs', 'extra_resources')
+
+
+@event.listens_for(TableVersion.__table__, 'after_create')
+def _create_versions(target, connection, **kw):
+    connection.execute(insert(TableVersion), [{'name': name, 'version': 0} for name in VERSIONED_TABLES])
+
+
+def _bump(session, table):
+    connection = session.connection()
+    result = connection.execute(
+        update(TableVersion).where(TableVersion.name == table).values(version=TableVersion.version + 1)
+    )
+    if not result.rowcount:
+        connection.execute(insert(TableVersion).values(name=table, version=1))
+
+
+for _table in VERSIONED_TABLES:
+    on_write(_table)(_bump)
+
+
+def versions_query(tables):
+    return select(TableVersion.name, TableVersion.version).where(TableVersion.name.in_(tables))
+
+
+def table_versions(tables):
+    versions = dict(db.session.execute(versions_query(tables)).all())
+    return [versions.get(table, 0) for table in tables]
+
+
+# The same, on the async session of a request served by asgi.py
+async def async_table_versions(tables):
+    versions = dict((await g.async_session.execute(versions_query(tables))).all())
+    return [versions.get(table, 0) for table in tables]
+
+
+def request_etag(tables, versions, extras):
+    parts = [
+        request.path,
+        '&'.join(f'{name}={value}' for name, value in sorted(request.args.items(multi=True))),
+        ','.join(f'{table}@{version}' for table, version in zip(tables, versions)),
+        *(extra(request.args) for extra in extras),
+    ]
+    return hashlib.sha1('|'.join(parts).encode()).hexdigest()
+
+
+def not_modified(etag):
+    response = current_app.response_class(status=304)
+    response.set_etag(etag)
+    return response
+
+
+def tagged(response, etag):
+    if getattr(response, 'status_code', None) == 200:
+        response.set_etag(etag)
+    return response
+
+
+# Adds a strong ETag to successful responses of a Resource method and answers
+# a matching If-None-Match with 304. Keys are the names of the tables the
+# response reads, or callables taking the request args for anything else the
+# response depends on. Works on async handlers too (see asgi.py)
+def conditional(*keys):
+    tables = [key for key in keys if not callable(key)]
+    extras = [key for key in keys if callable(key)]
+
+    def decorator(method):
+        # Read the versions before the data, so a write landing in between
+        # can only make the ETag older than the body, never newer. The ETag is
+        # left in g.etag for response_cache.cached, which keys on it
+        @wraps(method)
+        def wrapper(*args, **kwargs):
+            etag = request_etag(tables, table_versions(tables), extras)
+            if etag in request.if_none_match:
+                return not_modified(etag)
+            g.etag = etag
+            return tagged(method(*args, **kwargs), etag)
+
+        @wraps(method)
+        async def async_wrapper(*args, **kwargs):
+            etag = request_etag(tables, await async_table_versions(tables), extras)
+            if etag in request.if_none_match:
+                return not_modified(etag)
+            g.etag = etag
+            return tagged(await method(*args, **kwargs), etag)
+
+        return async_wrapper if inspect.iscoroutinefunction(method) else wrapper
+    return decorator
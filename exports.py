@@ -0,0 +1,149 @@
+from flask import current_app, stream_with_context
+from sqlalchemy import select
+from encoders import get_backend
+from models import db, User, Job, JobApplication, Payment
+from datetime import datetime, timedelta
+import csv
+import io
+import zlib
+
+# Streaming exports for tables too big to build into one response. Rows are
+# fetched yield_per batches at a time and written out as they are serialized,
+# so memory stays flat however many rows the query returns
+BATCH_SIZE = 1000
+GZIP_LEVEL = 6
+
+# CSV columns, named after the keys of the matching to_dict()
+USER_COLUMNS = [
+    ('user.username', User.username),
+    ('user.email', User.email),
+    ('user.phone', User.phone),
+    ('user.role', User.role),
+    ('user.date_joined', User.date_joined),
+]
+PAYMENT_COLUMNS = [
+    ('amount', Payment.amount),
+    ('payment_date', Payment.payment_date),
+    ('payment_status', Payment.payment_status),
+] + USER_COLUMNS
+APPLICATION_COLUMNS = [
+    ('application_date', JobApplication.application_date),
+    ('status', JobApplication.status),
+] + USER_COLUMNS + [
+    (f'job.{name}', getattr(Job, name)) for name in (
+        'title', 'description', 'location', 'salary_min', 'salary_max', 'job_type', 'skills_required',
+        'benefits', 'application_deadline', 'employer', 'employer_email', 'employer_phone', 'date_posted', 'is_active'
+    )
+]
+
+
+def stream_format(args):
+    stream = args.get('stream', type=str)
+    if stream not in (None, 'ndjson'):
+        raise ValueError(f"Invalid stream format '{stream}'. Supported formats: ndjson.")
+    return stream
+
+
+# One JSON document per line (application/x-ndjson), e.g.
+#   ndjson_response(applications_query().order_by(JobApplication.id), JobApplication.to_dict)
+def ndjson_response(query, to_dict):
+    dumps, _ = get_backend(current_app.config.get('JSON_BACKEND', 'auto'))
+
+    def generate():
+        lines = []
+        # As a 2.0-style select: Query would unique() the joined eager loads,
+        # which needs every row in memory
+        rows = db.session.scalars(query.statement, execution_options={'yield_per': BATCH_SIZE})
+        for row in rows:
+            lines.append(dumps(to_dict(row)))
+            if len(lines) == BATCH_SIZE:
+                yield b'\n'.join(lines) + b'\n'
+                lines = []
+        if lines:
+            yield b'\n'.join(lines) + b'\n'
+
+    return current_app.response_class(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+
+# ?from= and ?to= as ISO dates or datetimes. A plain date in "to" includes that whole day
+def date_range(args):
+    bounds = []
+    for name in ('from', 'to'):
+        value = args.get(name, type=str)
+        if not value:
+            bounds.append(None)
+            continue
+        try:
+            bound = datetime.fromisoformat(value)
+        except ValueError:
+            raise ValueError(f"Invalid {name} date '{value}'. Use YYYY-MM-DD or YYYY-MM-DDTHH:MM:SS.")
+        if name == 'to' and len(value) == 10:
+            bound += timedelta(days=1)
+        bounds.append(bound)
+    return bounds
+
+
+def payments_export(args):
+    date_from, date_to = date_range(args)
+    query = select(*(column for _, column in PAYMENT_COLUMNS)).join(User, Payment.user_id == User.id)
+    if date_from:
+        query = query.where(Payment.payment_date >= date_from)
+    if date_to:
+        query = query.where(Payment.payment_date < date_to)
+    return [name for name, _ in PAYMENT_COLUMNS], query.order_by(Payment.payment_date, Payment.id)
+
+
+def applications_export(args):
+    date_from, date_to = date_range(args)
+    query = select(*(column for _, column in APPLICATION_COLUMNS)) \
+        .join(User, JobApplication.user_id == User.id) \
+        .join(Job, JobApplication.job_id == Job.id)
+    if date_from:
+        query = query.where(JobApplication.application_date >= date_from)
+    if date_to:
+        query = query.where(JobApplication.application_date < date_to)
+    return [name for name, _ in APPLICATION_COLUMNS], query.order_by(JobApplication.application_date, JobApplication.id)
+
+
+# Spreadsheets run cells starting with any of these as formulas (OWASP's CSV
+# injection list). Job text comes from partner feeds, so every one is quoted;
+# a quoted phone number (+254 ...) just stays text
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+
+def _cell(value):
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+# Streams a select as a CSV download, gzip-compressed on the fly when asked
+def csv_response(header, query, filename, gzip=False):
+    def generate():
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(header)
+        rows = db.session.execute(query, execution_options={'yield_per': BATCH_SIZE})
+        for batch in rows.partitions():
+            writer.writerows([_cell(value) for value in row] for row in batch)
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue().encode()
+
+    def compress(chunks):
+        compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+        for chunk in chunks:
+            data = compressor.compress(chunk)
+            if data:
+                yield data
+        yield compressor.flush()
+
+    body = compress(generate()) if gzip else generate()
+    response = current_app.response_class(stream_with_context(body), mimetype='text/csv')
+    response.headers['Content-Disposition'] = f'attachment; filename={filename}'
+    response.vary.add('Accept-Encoding')
+    if gzip:
+        response.headers['Content-Encoding'] = 'gzip'
+    return response
@@ -0,0 +1,66 @@
+from sqlalchemy import case, func
+from cache import LocalBackend
+from hooks import on_commit
+from models import Job
+from queries import filtered_jobs
+
+# Counts per job_type, location and salary bucket for a filtered job listing.
+# One GROUP BY over all three facets returns the (small) cube of combinations,
+# and each facet's counts are summed from it, so the jobs table is read once.
+# Results are cached per filter set until the next job write
+SALARY_BUCKETS = (0, 250000, 500000, 1000000, 1500000, 2000000)
+FILTER_ARGS = ('location', 'job_type', 'salary_min', 'salary_max', 'is_active', 'open')
+CACHE_SIZE = 256
+# open=true depends on the clock, so cached counts also expire
+CACHE_TTL = 60
+
+
+def bucket_label(low, high):
+    return f"{low}-{high}" if high else f"{low}+"
+
+
+def salary_bucket():
+    bounds = list(zip(SALARY_BUCKETS, SALARY_BUCKETS[1:] + (None,)))
+    return case(
+        *[(Job.salary_min < high, bucket_label(low, high)) for low, high in bounds if high],
+        else_=case((Job.salary_min.is_(None), None), else_=bucket_label(SALARY_BUCKETS[-1], None))
+    )
+
+
+facet_cache = LocalBackend(CACHE_SIZE)
+
+
+@on_commit('jobs')
+def _jobs_changed(rows):
+    facet_cache.clear()
+
+
+def facet_counts(args):
+    key = tuple((name, args.get(name)) for name in FILTER_ARGS)
+    cached = facet_cache.get(key)
+    if cached is not None:
+        return cached
+
+    bucket = salary_bucket().label('salary_bucket')
+    cube = filtered_jobs(args).with_entities(
+        Job.job_type, Job.location, bucket, func.count()
+    ).group_by(Job.job_type, Job.location, bucket).all()
+
+    facets = {'job_type': {}, 'location': {}, 'salary': {}}
+    total = 0
+    for job_type, location, salary, count in cube:
+        total += count
+        facets['job_type'][job_type] = facets['job_type'].get(job_type, 0) + count
+        facets['location'][location] = facets['location'].get(location, 0) + count
+        if salary is not None:
+            facets['salary'][salary] = facets['salary'].get(salary, 0) + count
+
+    # Salary buckets in ascending order, the others by count
+    bounds = zip(SALARY_BUCKETS, SALARY_BUCKETS[1:] + (None,))
+    facets['salary'] = {label: facets['salary'][label] for label in (bucket_label(low, high) for low, high in bounds) if label in facets['salary']}
+    for name in ('job_type', 'location'):
+        facets[name] = dict(sorted(facets[name].items(), key=lambda item: (-item[1], item[0])))
+
+    result = {'total': total, 'facets': facets}
+    facet_cache.set(key, result, CACHE_TTL)
+    return result
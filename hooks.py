@@ -0,0 +1,76 @@
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+from collections import defaultdict
+
+# Lets in-process indexes and caches follow database writes. Rows written
+# through the ORM are recorded per table at flush time, and listeners run once
+# the transaction commits (nothing runs if it rolls back).
+#
+# Each listener gets {row_id: column values}, with None for deleted rows.
+# Values are captured at flush, because the objects are expired after commit.
+_listeners = defaultdict(list)
+
+# on_write listeners instead run inside the transaction, the first time a
+# table is written in it, and get (session, table)
+_write_listeners = defaultdict(list)
+
+
+def on_commit(table):
+    def register(func):
+        _listeners[table].append(func)
+        return func
+    return register
+
+
+def on_write(table):
+    def register(func):
+        _write_listeners[table].append(func)
+        return func
+    return register
+
+
+# Record a change the ORM doesn't see, e.g. a bulk INSERT or a set-based UPDATE
+def record_change(session, table, row_id, values):
+    written = session.info.setdefault('written', set())
+    if table not in written:
+        written.add(table)
+        for listener in _write_listeners.get(table, ()):
+            listener(session, table)
+    session.info.setdefault('changes', defaultdict(dict))[table][row_id] = values
+
+
+def _tracked(table):
+    return table in _listeners or table in _write_listeners
+
+
+def _snapshot(obj):
+    return {attr.key: getattr(obj, attr.key) for attr in inspect(obj).mapper.column_attrs}
+
+
+@event.listens_for(Session, 'after_flush')
+def _collect_changes(session, flush_context):
+    for obj in list(session.new) + list(session.dirty):
+        table = obj.__table__.name
+        if _tracked(table) and session.is_modified(obj):
+            record_change(session, table, obj.id, _snapshot(obj))
+    for obj in session.deleted:
+        table = obj.__table__.name
+        if _tracked(table):
+            record_change(session, table, obj.id, None)
+
+
+@event.listens_for(Session, 'after_commit')
+def _dispatch_changes(session):
+    session.info.pop('written', None)
+    changes = session.info.pop('changes', None)
+    if not changes:
+        return
+    for table, rows in changes.items():
+        for listener in _listeners.get(table, ()):
+            listener(rows)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_changes(session):
+    session.info.pop('written', None)
+    session.info.pop('changes', None)
@@ -0,0 +1,63 @@
+"""add jobs_fts full-text index with sync triggers
+
+Revision ID: c3e8b41f0a92
+Revises: ad0732d50629
+Create Date: 2026-10-17 10:41:03.552871
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c3e8b41f0a92'
+down_revision = 'ad0732d50629'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # FTS5 is SQLite only
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+
+    op.execute("""
+        CREATE VIRTUAL TABLE jobs_fts USING fts5(
+            title, description, skills_required, benefits, employer, location,
+            content='jobs', content_rowid='id',
+            tokenize='porter unicode61 remove_diacritics 2'
+        )
+    """)
+    op.execute("""
+        CREATE TRIGGER jobs_fts_insert AFTER INSERT ON jobs BEGIN
+            INSERT INTO jobs_fts(rowid, title, description, skills_required, benefits, employer, location)
+            VALUES (new.id, new.title, new.description, new.skills_required, new.benefits, new.employer, new.location);
+        END
+    """)
+    op.execute("""
+        CREATE TRIGGER jobs_fts_delete AFTER DELETE ON jobs BEGIN
+            INSERT INTO jobs_fts(jobs_fts, rowid, title, description, skills_required, benefits, employer, location)
+            VALUES ('delete', old.id, old.title, old.description, old.skills_required, old.benefits, old.employer, old.location);
+        END
+    """)
+    op.execute("""
+        CREATE TRIGGER jobs_fts_update
+        AFTER UPDATE OF title, description, skills_required, benefits, employer, location ON jobs BEGIN
+            INSERT INTO jobs_fts(jobs_fts, rowid, title, description, skills_required, benefits, employer, location)
+            VALUES ('delete', old.id, old.title, old.description, old.skills_required, old.benefits, old.employer, old.location);
+            INSERT INTO jobs_fts(rowid, title, description, skills_required, benefits, employer, location)
+            VALUES (new.id, new.title, new.description, new.skills_required, new.benefits, new.employer, new.location);
+        END
+    """)
+    # Index the postings that already exist
+    op.execute("INSERT INTO jobs_fts(jobs_fts) VALUES ('rebuild')")
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+
+    op.execute("DROP TRIGGER IF EXISTS jobs_fts_update")
+    op.execute("DROP TRIGGER IF EXISTS jobs_fts_delete")
+    op.execute("DROP TRIGGER IF EXISTS jobs_fts_insert")
+    op.execute("DROP TABLE IF EXISTS jobs_fts")
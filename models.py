@@ -2,29 +2,55 @@ from flask_sqlalchemy import SQLAlchemy
 from sqlalchemy import MetaData, event
 from sqlalchemy.orm import validates, relationship
 from sqlalchemy_serializer import SerializerMixin
+from replica import RoutingSession
 from datetime import datetime
 import re
 
-# Initialize the SQLAlchemy object
-db = SQLAlchemy(metadata=MetaData())
+# Initialize the SQLAlchemy object; sessions can route reads to a replica (replica.py)
+db = SQLAlchemy(metadata=MetaData(), session_options={'class_': RoutingSession})
 
 
+# Named column sets per endpoint. Endpoints select just these columns and build
+# response dicts from the row tuples, so related rows are never loaded
+class ProjectionMixin:
+    projections = {}
+
+    @classmethod
+    def projection(cls, name, requested=None):
+        fields = cls.projections[name]
+        if requested:
+            unknown = [field for field in requested if field not in fields]
+            if unknown:
+                raise ValueError(f"Unknown fields: {', '.join(unknown)}. Allowed fields: {', '.join(fields)}.")
+            fields = tuple(field for field in fields if field in requested)
+        return fields
+
+    @classmethod
+    def columns(cls, fields):
+        return [getattr(cls, field) for field in fields]
+
 
 # Base User class for common attributes
-class User(db.Model, SerializerMixin):
+class User(db.Model, SerializerMixin, ProjectionMixin):
     __tablename__ = 'users'
 
     id = db.Column(db.Integer, primary_key=True)
     username = db.Column(db.String(80), unique=True, nullable=False)
     email = db.Column(db.String(120), unique=True, nullable=False)
     phone = db.Column(db.String(20), nullable=True)
-    password_hash = db.Column(db.String(128), nullable=False)
+    password_hash = db.Column(db.String(255), nullable=False)
     role = db.Column(db.String(50), nullable=False, default="graduate")
+    skills = db.Column(db.String(255), nullable=True)
     date_joined = db.Column(db.DateTime, default=datetime.utcnow)
 
     payments = db.relationship('Payment', back_populates='user', lazy=True, overlaps="user_payment")
     applications = db.relationship('JobApplication', back_populates='user', lazy=True, overlaps="user_application")
 
+    projections = {
+        'list': ('username', 'email', 'phone', 'role', 'skills', 'date_joined'),
+        'detail': ('username', 'email', 'phone', 'role', 'skills', 'date_joined'),
+    }
+
     @validates('email')
     def validate_email(self, key, email):
         if not re.match(r"[^@]+@[^@]+\.[^@]+", email):
@@ -43,6 +69,7 @@ class User(db.Model, SerializerMixin):
             "email": self.email,
             "phone": self.phone,
             "role": self.role,
+            "skills": self.skills,
             "date_joined": self.date_joined,
             "payments": [payment.to_dict() for payment in self.payments],
             "applications": [app.to_dict() for app in self.applications]
@@ -50,11 +77,20 @@ class User(db.Model, SerializerMixin):
         return user_dict
 
 # Job model with employer contact information
-class Job(db.Model, SerializerMixin):
+class Job(db.Model, SerializerMixin, ProjectionMixin):
     __tablename__ = 'jobs'
+    __table_args__ = (
+        # Keyset pagination on the job listing walks this index
+        db.Index('ix_jobs_date_posted_id', 'date_posted', 'id'),
+        # Filtered listings keep the same order within a location or job type
+        db.Index('ix_jobs_location_date_posted', 'location', 'date_posted', 'id'),
+        db.Index('ix_jobs_job_type_date_posted', 'job_type', 'date_posted', 'id'),
+        # Open and active postings (is_active with a deadline still ahead)
+        db.Index('ix_jobs_is_active_application_deadline', 'is_active', 'application_deadline'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
-    title = db.Column(db.String(120), nullable=False)
+    title = db.Column(db.String(120), nullable=False, index=True)
     description = db.Column(db.Text, nullable=False)
     location = db.Column(db.String(100), nullable=False)
     salary_min = db.Column(db.Float, nullable=True)
@@ -68,10 +104,25 @@ class Job(db.Model, SerializerMixin):
     employer_phone = db.Column(db.String(20), nullable=True)
     date_posted = db.Column(db.DateTime, default=datetime.utcnow)
     is_active = db.Column(db.Boolean, default=True)
+    # The posting's ID in the partner feed it was imported from (see bulk.py)
+    external_id = db.Column(db.String(100), nullable=True, unique=True, index=True)
 
     applications = db.relationship('JobApplication', back_populates='job', lazy=True)
     extra_resources = db.relationship('ExtraResource', back_populates='job', lazy=True)
 
+    projections = {
+        'list': (
+            'title', 'description', 'location', 'salary_min', 'salary_max', 'job_type',
+            'skills_required', 'benefits', 'application_deadline', 'employer',
+            'employer_email', 'employer_phone', 'date_posted', 'is_active'
+        ),
+        'detail': (
+            'title', 'description', 'location', 'salary_min', 'salary_max', 'job_type',
+            'skills_required', 'benefits', 'application_deadline', 'employer',
+            'employer_email', 'employer_phone', 'date_posted', 'is_active'
+        ),
+    }
+
     @validates('salary_min', 'salary_max')
     def validate_salary(self, key, salary):
         if salary is not None and salary < 0:
@@ -117,9 +168,9 @@ class JobApplication(db.Model, SerializerMixin):
     __tablename__ = 'job_applications'
 
     id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
-    job_id = db.Column(db.Integer, db.ForeignKey('jobs.id'), nullable=False)
-    application_date = db.Column(db.DateTime, default=datetime.utcnow)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
+    job_id = db.Column(db.Integer, db.ForeignKey('jobs.id'), nullable=False, index=True)
+    application_date = db.Column(db.DateTime, default=datetime.utcnow, index=True)
     status = db.Column(db.String(50), default="pending")
 
     user = db.relationship('User', back_populates='applications', lazy=True)
@@ -166,9 +217,9 @@ class Payment(db.Model, SerializerMixin):
     __tablename__ = 'payments'
 
     id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
     amount = db.Column(db.Float, nullable=False, default=5000)
-    payment_date = db.Column(db.DateTime, default=datetime.utcnow)
+    payment_date = db.Column(db.DateTime, default=datetime.utcnow, index=True)
     payment_status = db.Column(db.String(50), default="completed")
 
     user = db.relationship('User', back_populates='payments', lazy=True)
@@ -200,10 +251,10 @@ class ExtraResource(db.Model, SerializerMixin):
     __tablename__ = 'extra_resources'
 
     id = db.Column(db.Integer, primary_key=True)
-    job_id = db.Column(db.Integer, db.ForeignKey('jobs.id'), nullable=False)
+    job_id = db.Column(db.Integer, db.ForeignKey('jobs.id'), nullable=False, index=True)
     resource_name = db.Column(db.String(120), nullable=False)
     description = db.Column(db.Text)
-    resource_type = db.Column(db.String(50), nullable=False)
+    resource_type = db.Column(db.String(50), nullable=False, index=True)
 
     job = db.relationship('Job', back_populates='extra_resources')
 
@@ -230,3 +281,18 @@ class ExtraResource(db.Model, SerializerMixin):
             }
         }
         return resource_dict
+
+# Write counter per table, bumped in the writing transaction (see etags.py)
+class TableVersion(db.Model):
+    __tablename__ = 'table_versions'
+
+    name = db.Column(db.String(50), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+
+# Access tokens revoked before they expire (see auth.py)
+class RevokedToken(db.Model):
+    __tablename__ = 'revoked_tokens'
+
+    jti = db.Column(db.String(36), primary_key=True)
+    expires_at = db.Column(db.DateTime, nullable=False)
+    revoked_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, index=True)
@@ -0,0 +1,124 @@
+from concurrent.futures import TimeoutError
+from werkzeug.security import generate_password_hash, check_password_hash
+import os
+import threading
+
+# Password hashing off the request thread. The KDF is deliberately slow, so
+# it runs in a small pool of worker processes; a burst of logins then queues
+# for those workers instead of taking every core from the other endpoints.
+# At most PASSWORD_QUEUE_DEPTH hashes are queued or running at once, beyond
+# that requests fail fast with PasswordsBusy (429 from the API).
+#
+# PASSWORD_HASH_METHOD takes werkzeug's method strings, e.g. 'scrypt:32768:8:1'
+# or 'pbkdf2:sha256:600000'. Hashes made with other settings still verify, and
+# are replaced at the user's next login.
+
+
+class PasswordsBusy(Exception):
+    pass
+
+
+# Run in the worker processes
+def _hash(password, method, salt_length):
+    return generate_password_hash(password, method=method, salt_length=salt_length)
+
+
+# Returns (matches, new hash or None), the new hash when the stored one was
+# made with other settings
+def _check(password_hash, password, method, salt_length):
+    if not check_password_hash(password_hash, password):
+        return False, None
+    if password_hash.split('$', 1)[0] != method:
+        return True, _hash(password, method, salt_length)
+    return True, None
+
+
+def _start_worker(priority):
+    # Below the web workers, so hashing yields the CPU to everything else
+    if priority:
+        os.nice(priority)
+
+
+class Passwords:
+    def __init__(self):
+        self.method = 'scrypt:32768:8:1'
+        self.salt_length = 16
+        self.workers = 0
+        self.timeout = 10
+        self.priority = 0
+        self.queue_depth = 0
+        self.slots = None
+        self.pool = None
+        self.lock = threading.Lock()
+
+    def init_app(self, app):
+        app.config.setdefault('PASSWORD_HASH_METHOD', 'scrypt:32768:8:1')
+        app.config.setdefault('PASSWORD_SALT_LENGTH', 16)
+        app.config.setdefault('PASSWORD_WORKERS', 2)
+        app.config.setdefault('PASSWORD_QUEUE_DEPTH', 16)
+        app.config.setdefault('PASSWORD_TIMEOUT', 10)
+        app.config.setdefault('PASSWORD_WORKER_NICE', 10)
+        self.method = app.config['PASSWORD_HASH_METHOD']
+        self.salt_length = app.config['PASSWORD_SALT_LENGTH']
+        self.workers = app.config['PASSWORD_WORKERS']
+        self.timeout = app.config['PASSWORD_TIMEOUT']
+        self.priority = app.config['PASSWORD_WORKER_NICE']
+        self.queue_depth = app.config['PASSWORD_QUEUE_DEPTH']
+        self.slots = threading.BoundedSemaphore(self.queue_depth)
+        self.shutdown()
+
+    # Started on first use, so each server process gets its own workers (and
+    # one-shot scripts don't import multiprocessing)
+    def _executor(self):
+        from concurrent.futures import ProcessPoolExecutor
+        import multiprocessing
+        with self.lock:
+            if self.pool is None:
+                self.pool = ProcessPoolExecutor(
+                    self.workers,
+                    # Not forked: the server process has threads and open connections
+                    mp_context=multiprocessing.get_context('spawn'),
+                    initializer=_start_worker,
+                    initargs=(self.priority,),
+                )
+            return self.pool
+
+    def _run(self, func, *args):
+        # PASSWORD_WORKERS = 0 hashes on the calling thread (scripts, tests)
+        if not self.workers:
+            return func(*args)
+        if not self.slots.acquire(blocking=False):
+            raise PasswordsBusy("Too many sign-ins in progress, try again shortly.")
+        try:
+            future = self._executor().submit(func, *args)
+        except Exception:
+            self.slots.release()
+            raise
+        # The slot stays taken until the worker is done, even if we stop waiting
+        future.add_done_callback(lambda _: self.slots.release())
+        try:
+            return future.result(timeout=self.timeout)
+        except TimeoutError:
+            raise PasswordsBusy("Sign-in is taking too long, try again shortly.")
+
+    def hash(self, password):
+        return self._run(_hash, password, self.method, self.salt_length)
+
+    def check(self, password_hash, password):
+        return self._run(_check, password_hash, password, self.method, self.salt_length)
+
+    def shutdown(self):
+        with self.lock:
+            if self.pool is not None:
+                self.pool.shutdown(wait=False, cancel_futures=True)
+                self.pool = None
+
+    # In a forked process: the parent's workers and queue didn't come along
+    def after_fork(self):
+        self.lock = threading.Lock()
+        self.pool = None
+        if self.slots is not None:
+            self.slots = threading.BoundedSemaphore(self.queue_depth)
+
+
+passwords = Passwords()
@@ -0,0 +1,53 @@
+from models import db
+from skills import skill_index
+from autocomplete import autocomplete
+from similar import similar_jobs
+from passwords import passwords
+import gc
+import os
+import weakref
+
+# Setup for pre-fork servers, which build the app once and fork their
+# workers from it, e.g.
+#   gunicorn --preload --workers 4 wsgi:app
+# preload() builds the skill index, the autocomplete trie and the similar-jobs
+# weights in the server process, so every worker starts with them (shared
+# copy-on-write) instead of building its own on its first request. Connections
+# must not be shared between processes: the server process closes its own
+# before forking, and a forked worker drops whatever pool it inherited without
+# touching the parent's connections, then opens new ones as it needs them.
+
+
+class Prefork:
+    def __init__(self):
+        self.apps = weakref.WeakSet()
+
+    def init_app(self, app):
+        app.config.setdefault('PRELOAD_INDEXES', True)
+        self.apps.add(app)
+
+    # Call in the server process, once the app is built and before forking
+    def preload(self, app):
+        with app.app_context():
+            if app.config['PRELOAD_INDEXES']:
+                skill_index.load()
+                autocomplete.load()
+                similar_jobs.warm()
+            for engine in db.engines.values():
+                engine.dispose()
+        passwords.shutdown()
+        # Keeps the collector from touching (and so copying) the preloaded
+        # objects' pages in the workers
+        gc.freeze()
+
+    def after_fork(self):
+        for app in list(self.apps):
+            with app.app_context():
+                for engine in db.engines.values():
+                    # close=False: the parent's connections stay open for the parent
+                    engine.dispose(close=False)
+        passwords.after_fork()
+
+
+prefork = Prefork()
+os.register_at_fork(after_in_child=prefork.after_fork)
@@ -0,0 +1,150 @@
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import joinedload
+from models import db, Job, JobApplication, Payment, ExtraResource
+from datetime import datetime
+import base64
+import json
+import time
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+# Cursor tokens are the (date_posted, id) of the last row on a page, so the
+# next page starts right after it instead of OFFSET-skipping earlier rows
+def encode_cursor(date_posted, job_id):
+    payload = json.dumps([date_posted.isoformat(), job_id]).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        date_posted, job_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(date_posted), int(job_id)
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor.")
+
+
+def parse_bool(value):
+    if value is None:
+        return None
+    value = value.strip().lower()
+    if value in ('1', 'true', 'yes'):
+        return True
+    if value in ('0', 'false', 'no'):
+        return False
+    raise ValueError(f"Invalid boolean value '{value}'.")
+
+
+def page_size(value):
+    if value is None:
+        return DEFAULT_PAGE_SIZE
+    if value < 1:
+        raise ValueError("limit must be a positive number.")
+    return min(value, MAX_PAGE_SIZE)
+
+
+# Optional ?fields=title,location list that trims a projection further
+def requested_fields(args):
+    fields = args.get('fields', type=str)
+    if not fields:
+        return None
+    return [field.strip() for field in fields.split(',') if field.strip()]
+
+
+def rows_to_dicts(fields, rows):
+    return [dict(zip(fields, row)) for row in rows]
+
+
+# Selects only the projection's columns, e.g. project(User, 'list', request.args)
+def project(model, name, args):
+    fields = model.projection(name, requested_fields(args))
+    return fields, db.session.query(*model.columns(fields))
+
+
+# List queries for models whose to_dict reads related rows. The relationships
+# are lazy, so load them in the same SELECT instead of one query per row
+def applications_query():
+    return JobApplication.query.options(
+        joinedload(JobApplication.user),
+        joinedload(JobApplication.job)
+    )
+
+
+def payments_query():
+    return Payment.query.options(joinedload(Payment.user))
+
+
+def resources_query():
+    return ExtraResource.query.options(joinedload(ExtraResource.job))
+
+
+# open=true results change as deadlines pass, not only when jobs are written;
+# a key that moves every minute for ETags and caches of those listings
+def open_jobs_minute(args):
+    return str(int(time.time() // 60)) if args.get('open') else ''
+
+
+# Builds the filtered job listing query from request arguments
+def filtered_jobs(args):
+    query = Job.query
+
+    location = args.get('location', type=str)
+    if location:
+        query = query.filter(Job.location == location)
+
+    job_type = args.get('job_type', type=str)
+    if job_type:
+        query = query.filter(Job.job_type == job_type)
+
+    # A job matches a salary range when its own range overlaps it
+    salary_min = args.get('salary_min', type=float)
+    if salary_min is not None:
+        query = query.filter(Job.salary_max >= salary_min)
+
+    salary_max = args.get('salary_max', type=float)
+    if salary_max is not None:
+        query = query.filter(Job.salary_min <= salary_max)
+
+    is_active = parse_bool(args.get('is_active'))
+    if is_active is not None:
+        query = query.filter(Job.is_active == is_active)
+
+    if parse_bool(args.get('open')):
+        query = query.filter(Job.application_deadline >= datetime.utcnow())
+
+    return query
+
+
+# The query for one page of jobs (newest first), and a function turning its
+# rows into the page's job dicts and the cursor for the next page
+def jobs_page_query(args):
+    limit = page_size(args.get('limit', type=int))
+    fields = Job.projection('list', requested_fields(args))
+    # The cursor columns ride along at the end of each row
+    query = filtered_jobs(args).with_entities(*Job.columns(fields), Job.date_posted, Job.id)
+
+    cursor = args.get('cursor', type=str)
+    if cursor:
+        date_posted, job_id = decode_cursor(cursor)
+        query = query.filter(or_(
+            Job.date_posted < date_posted,
+            and_(Job.date_posted == date_posted, Job.id < job_id)
+        ))
+
+    def page(rows):
+        # One extra row is fetched to know whether another page exists
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(rows[-1][-2], rows[-1][-1])
+        return rows_to_dicts(fields, rows), next_cursor
+
+    return query.order_by(Job.date_posted.desc(), Job.id.desc()).limit(limit + 1), page
+
+
+# Returns one page of job dicts (newest first) and the cursor for the next page
+def jobs_page(args):
+    query, page = jobs_page_query(args)
+    return page(query.all())
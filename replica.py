@@ -0,0 +1,133 @@
+from flask import current_app, g, request, has_app_context
+from flask_sqlalchemy.session import Session
+from functools import wraps
+from cache import LocalBackend, RedisBackend
+import inspect
+import sqlite3
+import threading
+import time
+
+# Read/write routing for the admin reporting endpoints. Resources decorated
+# with @replica_reads run their SELECTs on the 'replica' bind (set with
+# DATABASE_REPLICA_URL); everything else, and every write, uses the primary.
+#
+# A replica lags the primary, so a client that has just written reads from
+# the primary for REPLICA_STICKY_SECONDS afterwards and sees its own write.
+# Locally the replica can be a copy of the SQLite file, refreshed through the
+# backup API every REPLICA_REFRESH_SECONDS, e.g.
+#   DATABASE_REPLICA_URL=sqlite:///Job-replica.db REPLICA_REFRESH_SECONDS=5 flask run
+
+WRITE_METHODS = ('POST', 'PUT', 'PATCH', 'DELETE')
+
+
+# Session class for db (see models.py): sends SELECTs to the replica engine
+# while g.read_replica is set, i.e. for the rest of a @replica_reads request
+class RoutingSession(Session):
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and not self._flushing and getattr(clause, 'is_select', False) \
+                and has_app_context() and g.get('read_replica'):
+            replica = self._db.engines.get('replica')
+            if replica is not None:
+                return replica
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+class Replicas:
+    def __init__(self):
+        # Client key -> primary-only marker, expiring after the sticky window
+        self.recent_writers = LocalBackend()
+        self.sticky_seconds = 10
+
+    def init_app(self, app):
+        app.config.setdefault('REPLICA_STICKY_SECONDS', 10)
+        app.config.setdefault('REPLICA_REFRESH_SECONDS', 0)
+        self.sticky_seconds = app.config['REPLICA_STICKY_SECONDS']
+        if 'replica' not in app.config.get('SQLALCHEMY_BINDS', {}):
+            return
+        # Shared between worker processes when the response cache is (redis)
+        if app.config.get('CACHE_BACKEND') == 'redis':
+            self.recent_writers = RedisBackend(app.config['CACHE_URL'], prefix='replica_sticky:')
+        else:
+            self.recent_writers = LocalBackend(app.config.get('CACHE_SIZE', 1024))
+        app.after_request(self._remember_writer)
+
+        if app.config['REPLICA_REFRESH_SECONDS']:
+            with app.app_context():
+                self.refresh()
+            thread = threading.Thread(target=self._refresh_loop, args=(app,), daemon=True)
+            thread.start()
+
+    # The signed-in user (see auth.py), otherwise the client address. Most
+    # write endpoints don't go through roles_required, so the bearer token is
+    # read here too; a write and the reads after it must get the same key
+    def client_key(self):
+        # auth.py imports models.py, which imports this module
+        from auth import auth
+        principal = g.get('principal')
+        if principal is None:
+            try:
+                principal = auth.principal()
+            except ValueError:
+                pass
+        if principal is not None:
+            return f"user:{principal.id}"
+        return f"addr:{request.remote_addr}"
+
+    def _remember_writer(self, response):
+        if request.method in WRITE_METHODS and response.status_code < 400 and self.sticky_seconds:
+            self.recent_writers.set(self.client_key(), True, self.sticky_seconds)
+        return response
+
+    def use_replica(self):
+        if 'replica' not in current_app.extensions['sqlalchemy'].engines:
+            return False
+        return not (self.sticky_seconds and self.recent_writers.get(self.client_key()))
+
+    # Decorator for Resource methods (sync or async) that only read
+    def reads(self, method):
+        # Kept on g, not reset on return, so streamed responses that run
+        # their queries after the method returns still use the replica
+        @wraps(method)
+        def wrapper(*args, **kwargs):
+            g.read_replica = self.use_replica()
+            return method(*args, **kwargs)
+
+        @wraps(method)
+        async def async_wrapper(*args, **kwargs):
+            g.read_replica = self.use_replica()
+            return await method(*args, **kwargs)
+
+        return async_wrapper if inspect.iscoroutinefunction(method) else wrapper
+
+    # Copies the primary SQLite database onto the replica file. The copy is a
+    # single backup step, so the replica always holds one consistent snapshot;
+    # readers of the replica (WAL mode) aren't blocked while it's written
+    def refresh(self):
+        engines = current_app.extensions['sqlalchemy'].engines
+        primary, replica = engines[None], engines.get('replica')
+        if replica is None or primary.dialect.name != 'sqlite' or replica.dialect.name != 'sqlite':
+            raise ValueError("Refreshing needs SQLite primary and replica databases; "
+                             "a server replica is kept up to date by the server.")
+
+        source = primary.raw_connection()
+        target = sqlite3.connect(replica.url.database)
+        try:
+            target.execute('PRAGMA journal_mode = WAL')
+            source.driver_connection.backup(target)
+        finally:
+            target.close()
+            source.close()
+
+    def _refresh_loop(self, app):
+        while True:
+            time.sleep(app.config['REPLICA_REFRESH_SECONDS'])
+            try:
+                with app.app_context():
+                    self.refresh()
+            except Exception as e:
+                app.logger.warning("Replica refresh failed: %s", e)
+
+
+replicas = Replicas()
+replica_reads = replicas.reads
+
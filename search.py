@@ -0,0 +1,149 @@
+from sqlalchemy import DDL, DateTime, case, event, func, literal, or_, select, text
+from models import db, Job
+import re
+
+# Full-text search over job postings. jobs_fts is an FTS5 index over the jobs
+# table (external content, so the text is stored only once) kept in sync by
+# triggers. Column order matters for the bm25() weights and highlight() below.
+# On PostgreSQL the same search runs on its built-in text search, and on other
+# databases as a (slower) substring match, with the same result fields
+FTS_COLUMNS = ('title', 'description', 'skills_required', 'benefits', 'employer', 'location')
+FTS_WEIGHTS = (10.0, 1.0, 5.0, 1.0, 3.0, 2.0)
+
+_columns = ', '.join(FTS_COLUMNS)
+_new_values = ', '.join(f'new.{column}' for column in FTS_COLUMNS)
+_old_values = ', '.join(f'old.{column}' for column in FTS_COLUMNS)
+
+FTS_DDL = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS jobs_fts USING fts5(
+        {_columns}, content='jobs', content_rowid='id',
+        tokenize='porter unicode61 remove_diacritics 2'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS jobs_fts_insert AFTER INSERT ON jobs BEGIN
+        INSERT INTO jobs_fts(rowid, {_columns}) VALUES (new.id, {_new_values});
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS jobs_fts_delete AFTER DELETE ON jobs BEGIN
+        INSERT INTO jobs_fts(jobs_fts, rowid, {_columns}) VALUES ('delete', old.id, {_old_values});
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS jobs_fts_update AFTER UPDATE OF {_columns} ON jobs BEGIN
+        INSERT INTO jobs_fts(jobs_fts, rowid, {_columns}) VALUES ('delete', old.id, {_old_values});
+        INSERT INTO jobs_fts(rowid, {_columns}) VALUES (new.id, {_new_values});
+    END""",
+    # Index whatever rows the jobs table already holds
+    "INSERT INTO jobs_fts(jobs_fts) VALUES ('rebuild')",
+]
+
+FTS_DROP_DDL = [
+    "DROP TRIGGER IF EXISTS jobs_fts_update",
+    "DROP TRIGGER IF EXISTS jobs_fts_delete",
+    "DROP TRIGGER IF EXISTS jobs_fts_insert",
+    "DROP TABLE IF EXISTS jobs_fts",
+]
+
+# Keep db.create_all()/drop_all() (used by seed.py) in step with the migration
+for statement in FTS_DDL:
+    event.listen(Job.__table__, 'after_create', DDL(statement).execute_if(dialect='sqlite'))
+for statement in FTS_DROP_DDL:
+    event.listen(Job.__table__, 'before_drop', DDL(statement).execute_if(dialect='sqlite'))
+
+
+SEARCH_SQL = text(f"""
+    SELECT jobs.id, jobs.title, jobs.employer, jobs.location, jobs.job_type,
+           jobs.salary_min, jobs.salary_max, jobs.application_deadline,
+           highlight(jobs_fts, 0, :open_mark, :close_mark) AS title_highlight,
+           snippet(jobs_fts, 1, :open_mark, :close_mark, '...', 16) AS snippet,
+           bm25(jobs_fts, {', '.join(str(weight) for weight in FTS_WEIGHTS)}) AS score
+    FROM jobs_fts
+    JOIN jobs ON jobs.id = jobs_fts.rowid
+    WHERE jobs_fts MATCH :match
+    ORDER BY score
+    LIMIT :limit OFFSET :offset
+""").columns(application_deadline=DateTime)
+
+
+# PostgreSQL text search weight class per column, A the heaviest
+TSVECTOR_WEIGHTS = (
+    ('title', 'A'), ('skills_required', 'B'), ('employer', 'C'),
+    ('location', 'C'), ('description', 'D'), ('benefits', 'D'),
+)
+HEADLINE_OPTIONS = 'StartSel=<mark>, StopSel=</mark>'
+RESULT_COLUMNS = (
+    Job.id, Job.title, Job.employer, Job.location, Job.job_type,
+    Job.salary_min, Job.salary_max, Job.application_deadline,
+)
+
+
+def query_words(q):
+    words = re.findall(r'\w+', q or '')
+    if not words:
+        raise ValueError("q must contain at least one word.")
+    return words
+
+
+# Turns free text into an FTS5 query: every word must match, and the last one
+# may be a prefix (so "pyth" finds "Python"). Quoting keeps user input from
+# being read as FTS5 syntax
+def match_expression(q):
+    terms = [f'"{word}"' for word in query_words(q)]
+    terms[-1] += '*'
+    return ' '.join(terms)
+
+
+def sqlite_search(q, limit, offset):
+    rows = db.session.execute(SEARCH_SQL, {
+        'match': match_expression(q),
+        'open_mark': '<mark>',
+        'close_mark': '</mark>',
+        'limit': limit,
+        'offset': offset,
+    }).mappings().all()
+    # bm25() scores are lower for better matches; flip them for clients
+    return [dict(row, score=-row['score']) for row in rows]
+
+
+# Same rules as match_expression(); \w+ words carry no tsquery operators
+def postgresql_search(q, limit, offset):
+    words = query_words(q)
+    query = func.to_tsquery('english', ' & '.join(words[:-1] + [words[-1] + ':*']))
+    document = None
+    for column, weight in TSVECTOR_WEIGHTS:
+        part = func.setweight(func.to_tsvector('english', func.coalesce(getattr(Job, column), '')), weight)
+        document = part if document is None else document.op('||')(part)
+    score = func.ts_rank(document, query)
+    statement = select(
+        *RESULT_COLUMNS,
+        func.ts_headline('english', Job.title, query, HEADLINE_OPTIONS + ', HighlightAll=true').label('title_highlight'),
+        func.ts_headline('english', func.coalesce(Job.description, ''), query,
+                         HEADLINE_OPTIONS + ', MaxWords=16, MinWords=8').label('snippet'),
+        score.label('score'),
+    ).where(document.op('@@')(query)).order_by(score.desc(), Job.id).limit(limit).offset(offset)
+    return [dict(row) for row in db.session.execute(statement).mappings()]
+
+
+# Any other database: every word appears somewhere, scored by where (the
+# FTS5 column weights), no highlighting
+def substring_search(q, limit, offset):
+    words = query_words(q)
+    matches = {column: [getattr(Job, column).icontains(word, autoescape=True) for word in words] for column in FTS_COLUMNS}
+    score = literal(0.0)
+    for column, weight in zip(FTS_COLUMNS, FTS_WEIGHTS):
+        for match in matches[column]:
+            score = score + case((match, weight), else_=0.0)
+    statement = select(
+        *RESULT_COLUMNS,
+        Job.title.label('title_highlight'),
+        func.substr(Job.description, 1, 120).label('snippet'),
+        score.label('score'),
+    ).where(*(or_(*(matches[column][i] for column in FTS_COLUMNS)) for i in range(len(words)))) \
+        .order_by(score.desc(), Job.id).limit(limit).offset(offset)
+    return [dict(row) for row in db.session.execute(statement).mappings()]
+
+
+SEARCHES = {'sqlite': sqlite_search, 'postgresql': postgresql_search}
+
+
+# Returns one page of ranked matches (best first) and whether more pages exist
+def search_jobs(q, page=1, limit=20):
+    search = SEARCHES.get(db.engine.dialect.name, substring_search)
+    rows = search(q, limit + 1, (page - 1) * limit)
+    return rows[:limit], len(rows) > limit
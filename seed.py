@@ -1,5 +1,6 @@
-from app import app, db
-from app import User, Job, JobApplication, Payment, ExtraResource
+from app import create_app
+from models import db, User, Job, JobApplication, Payment, ExtraResource
+from similar import similar_jobs
 from werkzeug.security import generate_password_hash
 from datetime import datetime, timedelta
 import random
@@ -17,6 +18,7 @@ def seed_users():
             phone=create_random_phone(),
             password_hash=generate_password_hash("password123"),
             role="graduate",  # non-premium graduate
+            skills="Python, JavaScript, SQL",
             date_joined=datetime.utcnow() - timedelta(days=random.randint(30, 365))
         ),
         User(
@@ -25,6 +27,7 @@ def seed_users():
             phone=create_random_phone(),
             password_hash=generate_password_hash("securepass456"),
             role="premium_graduate",  # premium graduate
+            skills="SQL, Python, Machine Learning, Data Analysis",
             date_joined=datetime.utcnow() - timedelta(days=random.randint(30, 365))
         ),
         User(
@@ -33,6 +36,7 @@ def seed_users():
             phone=create_random_phone(),
             password_hash=generate_password_hash("mypassword789"),
             role="graduate",  # non-premium graduate
+            skills="Digital Marketing, SEO",
             date_joined=datetime.utcnow() - timedelta(days=random.randint(30, 365))
         ),
         User(
@@ -41,6 +45,7 @@ def seed_users():
             phone=create_random_phone(),
             password_hash=generate_password_hash("adminpass321"),
             role="admin",  # admin role
+            skills="Python, Cloud Computing, Agile",
             date_joined=datetime.utcnow() - timedelta(days=random.randint(30, 365))
         ),
         User(
@@ -49,6 +54,7 @@ def seed_users():
             phone=create_random_phone(),
             password_hash=generate_password_hash("joseph2023"),
             role="premium_graduate",  # premium graduate
+            skills="Figma, Prototyping, User Research",
             date_joined=datetime.utcnow() - timedelta(days=random.randint(30, 365))
         ),
         User(
@@ -57,6 +63,7 @@ def seed_users():
             phone=create_random_phone(),
             password_hash=generate_password_hash("securepassword"),
             role="graduate",  # non-premium graduate
+            skills="Excel, Communication",
             date_joined=datetime.utcnow() - timedelta(days=random.randint(30, 365))
         ),
         User(
@@ -65,6 +72,7 @@ def seed_users():
             phone=create_random_phone(),
             password_hash=generate_password_hash("securepass789"),
             role="premium_graduate",  # premium graduate
+            skills="Product Strategy, Agile, Roadmapping",
             date_joined=datetime.utcnow() - timedelta(days=random.randint(30, 365))
         ),
     ]
@@ -348,8 +356,8 @@ Interview Tips:
 
 
 # Main function to seed data
-def seed_data():
-    with app.app_context():
+def seed_data(config=None):
+    with create_app(config).app_context():
         print("Seeding data...")
         db.drop_all()  # Optional: Drop all tables before seeding (be cautious!)
         db.create_all()  # Create all tables
@@ -359,6 +367,7 @@ def seed_data():
         seed_job_applications()
         seed_payments()  # Only premium graduates will be included
         seed_extra_resources()
+        similar_jobs.rebuild()  # The shared similar-jobs matrix still holds the old rows
         
         print("Data seeded successfully.")
 
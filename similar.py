@@ -0,0 +1,234 @@
+from flask import current_app, has_app_context
+from hooks import on_commit
+from models import db, Job
+from datetime import datetime
+import fcntl
+import math
+import os
+import re
+import threading
+import zlib
+
+# "Similar jobs" from hashed bag-of-words vectors. Each active posting is one
+# row of a float32 matrix: sublinear term counts of its title, skills and
+# description hashed into DIMENSIONS buckets and L2-normalized. IDF weights are
+# derived from the matrix itself, so a write only touches its own row.
+#
+# The matrix lives in memory-mapped .npy files, so every worker process maps
+# the same pages instead of building its own copy. Writers take a file lock and
+# bump a version counter; readers refresh their derived arrays when it moves
+#
+# numpy is imported where it's used, so only processes that compute similar
+# jobs load it (see startup.py)
+DIMENSIONS = 1024
+FIELD_WEIGHTS = (('title', 3.0), ('skills_required', 2.0), ('description', 1.0))
+MIN_CAPACITY = 1024
+STOPWORDS = frozenset(
+    'a an and are as at be by for from in is it of on or our that the this to we will with you your'.split()
+)
+
+
+def tokenize(text):
+    return [word for word in re.findall(r'[a-z0-9+#]+', (text or '').lower()) if word not in STOPWORDS]
+
+
+def job_vector(values):
+    import numpy as np
+    counts = {}
+    for field, weight in FIELD_WEIGHTS:
+        for word in tokenize(values.get(field)):
+            bucket = zlib.crc32(word.encode()) % DIMENSIONS
+            counts[bucket] = counts.get(bucket, 0.0) + weight
+
+    vector = np.zeros(DIMENSIONS, dtype=np.float32)
+    for bucket, count in counts.items():
+        vector[bucket] = 1.0 + math.log(count)
+    norm = np.linalg.norm(vector)
+    if norm:
+        vector /= norm
+    return vector
+
+
+class SimilarJobs:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.path = None
+        self.inode = None
+        self.version = None
+
+    def _files(self, path=None):
+        path = path or self.path
+        return path + '.npy', path + '_ids.npy', path + '_meta.npy', path + '.lock'
+
+    def _create(self, path, ids, rows):
+        import numpy as np
+        capacity = max(MIN_CAPACITY, 2 * len(ids))
+        matrix_file, ids_file, meta_file, _ = self._files(path)
+        matrix = np.lib.format.open_memmap(matrix_file + '.tmp', mode='w+', dtype=np.float32, shape=(capacity, DIMENSIONS))
+        slots = np.lib.format.open_memmap(ids_file + '.tmp', mode='w+', dtype=np.int64, shape=(capacity,))
+        meta = np.lib.format.open_memmap(meta_file + '.tmp', mode='w+', dtype=np.int64, shape=(1,))
+        if len(ids):
+            matrix[:len(ids)] = rows
+            slots[:len(ids)] = ids
+        for array in (matrix, slots, meta):
+            array.flush()
+        del matrix, slots, meta
+        # Ids and meta go in first; the matrix file's inode tells readers to reopen
+        for name in (ids_file, meta_file, matrix_file):
+            os.replace(name + '.tmp', name)
+
+    def _open(self):
+        import numpy as np
+        matrix_file, ids_file, meta_file, _ = self._files()
+        self.matrix = np.load(matrix_file, mmap_mode='r+')
+        self.ids = np.load(ids_file, mmap_mode='r+')
+        self.meta = np.load(meta_file, mmap_mode='r+')
+        self.inode = os.stat(matrix_file).st_ino
+        self.version = None
+
+    def _locked(self):
+        return open(self._files()[3], 'w')
+
+    def _resolve_path(self):
+        path = current_app.config.get('SIMILAR_JOBS_PATH') or os.path.join(current_app.instance_path, 'similar_jobs')
+        if path != self.path:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            self.path = path
+            self.inode = None
+
+    # Build the files from the jobs table when they don't exist yet
+    def load(self):
+        self._resolve_path()
+        if self.inode is not None:
+            return
+        with self._locked() as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            if not os.path.exists(self._files()[0]):
+                self._build()
+            self._open()
+
+    # Replace the files with a fresh build, e.g. after reseeding the database
+    def rebuild(self):
+        self._resolve_path()
+        with self.lock, self._locked() as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            self._build()
+            self._open()
+
+    def _build(self):
+        import numpy as np
+        rows = db.session.query(Job.id, Job.title, Job.skills_required, Job.description).filter(Job.is_active.is_(True)).all()
+        ids = np.array([row.id for row in rows], dtype=np.int64)
+        vectors = np.array([job_vector(row._asdict()) for row in rows], dtype=np.float32).reshape(-1, DIMENSIONS)
+        self._create(self.path, ids, vectors)
+
+    # Re-derive the per-process arrays when another process changed the files
+    def _refresh(self):
+        import numpy as np
+        if os.stat(self._files()[0]).st_ino != self.inode:
+            self._open()
+        version = int(self.meta[0])
+        if version == self.version:
+            return
+        used = np.flatnonzero(self.ids)
+        self.slots = dict(zip(self.ids[used].tolist(), used.tolist()))
+        # Slots past the last used one are empty; queries skip them
+        self.extent = int(used[-1]) + 1 if len(used) else 0
+        matrix = np.asarray(self.matrix[:self.extent])
+        count = max(len(self.slots), 1)
+        document_frequency = np.count_nonzero(matrix, axis=0)
+        self.idf2 = np.square(np.log((1 + count) / (1 + document_frequency)) + 1).astype(np.float32)
+        self.norms = np.sqrt(np.square(matrix) @ self.idf2)
+        self.version = version
+
+    # Writes go straight into the shared files. If nobody has built them yet
+    # there is nothing to patch: the first load reads the committed rows
+    def apply(self, rows):
+        if not has_app_context():
+            return
+        with self.lock:
+            self._resolve_path()
+            if not os.path.exists(self._files()[0]):
+                return
+            with self._locked() as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                self._patch(rows)
+
+    def _patch(self, rows):
+        import numpy as np
+        if self.inode is None or os.stat(self._files()[0]).st_ino != self.inode:
+            self._open()
+        # Slot lookups for the whole batch come from one scan of the ids
+        slots = {int(self.ids[i]): int(i) for i in np.flatnonzero(np.isin(self.ids, list(rows)))}
+        free = iter(np.flatnonzero(self.ids == 0).tolist())
+        for job_id, values in rows.items():
+            slot = slots.pop(job_id, None)
+            if values is None or not values.get('is_active'):
+                if slot is not None:
+                    self.ids[slot] = 0
+                    self.matrix[slot] = 0
+                continue
+            if slot is None:
+                slot = next(free, None)
+                if slot is None:
+                    self._grow()
+                    free = iter(np.flatnonzero(self.ids == 0).tolist())
+                    slot = next(free)
+            self.matrix[slot] = job_vector(values)
+            self.ids[slot] = job_id
+        self.meta[0] += 1
+        self.matrix.flush()
+        self.ids.flush()
+        self.meta.flush()
+
+    def _grow(self):
+        import numpy as np
+        used = np.flatnonzero(self.ids)
+        self._create(self.path, np.array(self.ids[used]), np.array(self.matrix[used]))
+        self._open()
+
+    # Maps the matrix and computes the weights, so the first similar() call
+    # doesn't (e.g. in a server process before it forks its workers)
+    def warm(self):
+        self.load()
+        with self.lock:
+            self._refresh()
+
+    # Returns (job_id, score) pairs for the k postings closest to job_id
+    def similar(self, job_id, k=10):
+        import numpy as np
+        self.load()
+        with self.lock:
+            self._refresh()
+            slot = self.slots.get(job_id)
+            if slot is None:
+                return None
+            matrix = np.asarray(self.matrix[:self.extent])
+            query = matrix[slot] * self.idf2
+            query_norm = self.norms[slot]
+            with np.errstate(divide='ignore', invalid='ignore'):
+                scores = (matrix @ query) / (self.norms * query_norm)
+            scores[~np.isfinite(scores)] = -1.0
+            scores[slot] = -1.0
+
+            k = min(k, len(scores))
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top])]
+            return [(int(self.ids[i]), float(scores[i])) for i in top if scores[i] > 0]
+
+
+similar_jobs = SimilarJobs()
+on_commit('jobs')(similar_jobs.apply)
+
+
+# Similar open postings with the fields a job card needs, best match first
+def similar_job_cards(job_id, k=10):
+    matches = similar_jobs.similar(job_id, k)
+    if matches is None:
+        return None
+    scores = dict(matches)
+    rows = db.session.query(
+        Job.id, Job.title, Job.employer, Job.location, Job.job_type, Job.application_deadline
+    ).filter(Job.id.in_(scores), Job.application_deadline >= datetime.utcnow()).all()
+    cards = [dict(row._asdict(), score=round(scores[row.id], 4)) for row in rows]
+    return sorted(cards, key=lambda card: -card['score'])
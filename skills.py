@@ -0,0 +1,148 @@
+from array import array
+from bisect import bisect_left, insort
+from collections import Counter
+from datetime import datetime
+from etags import table_versions
+from hooks import on_commit
+from models import db, Job
+import heapq
+import re
+import threading
+
+# Common spellings mapped to one canonical skill name
+SKILL_ALIASES = {
+    'js': 'javascript',
+    'node': 'node.js',
+    'nodejs': 'node.js',
+    'ts': 'typescript',
+    'py': 'python',
+    'ml': 'machine learning',
+    'ai': 'artificial intelligence',
+    'postgres': 'postgresql',
+    'k8s': 'kubernetes',
+    'ms excel': 'excel',
+    'microsoft excel': 'excel',
+    'ux': 'user experience',
+    'ui': 'user interface',
+}
+
+
+def normalize_skill(skill):
+    skill = re.sub(r'\s+', ' ', skill.strip().lower())
+    return SKILL_ALIASES.get(skill, skill)
+
+
+# Splits a free-text skill list ("Python, JavaScript; SQL") into unique skills
+def tokenize_skills(text):
+    if not text:
+        return frozenset()
+    skills = (normalize_skill(part) for part in re.split(r'[,;|/\n]', text))
+    return frozenset(skill for skill in skills if skill)
+
+
+# Inverted index from skill to the sorted ids of the open jobs that need it.
+# Built once from the jobs table, then patched by job writes after each commit.
+# Every committed job write bumps the jobs row of table_versions once, and this
+# process's own writes also go through apply(), so the index counts them; when
+# the version in the database is ahead of that count, another worker wrote
+# jobs and the index is rebuilt
+class SkillIndex:
+    def __init__(self):
+        self.postings = {}
+        self.jobs = {}
+        self.sizes = {}
+        self.version = None
+        self.loaded = False
+        self.lock = threading.Lock()
+
+    def load(self):
+        # Read before the rows, so a write landing in between only makes the
+        # index look older than it is
+        version = table_versions(['jobs'])[0]
+        with self.lock:
+            if self.loaded and version == self.version:
+                return
+            self.postings, self.jobs, self.sizes = {}, {}, {}
+            rows = db.session.query(
+                Job.id, Job.title, Job.employer, Job.location,
+                Job.skills_required, Job.application_deadline
+            ).filter(Job.is_active.is_(True)).all()
+            for row in rows:
+                self._add(row.id, row._asdict())
+            self.version = version
+            self.loaded = True
+
+    def _add(self, job_id, values):
+        skills = tokenize_skills(values['skills_required'])
+        if not skills:
+            return
+        self.jobs[job_id] = {
+            'id': job_id,
+            'title': values['title'],
+            'employer': values['employer'],
+            'location': values['location'],
+            'application_deadline': values['application_deadline'],
+            'skills': skills,
+        }
+        self.sizes[job_id] = len(skills)
+        for skill in skills:
+            insort(self.postings.setdefault(skill, array('q')), job_id)
+
+    def _remove(self, job_id):
+        job = self.jobs.pop(job_id, None)
+        if job is None:
+            return
+        del self.sizes[job_id]
+        for skill in job['skills']:
+            posting = self.postings[skill]
+            del posting[bisect_left(posting, job_id)]
+            if not posting:
+                del self.postings[skill]
+
+    def apply(self, rows):
+        with self.lock:
+            if not self.loaded:
+                return
+            self.version += 1
+            for job_id, values in rows.items():
+                self._remove(job_id)
+                if values is not None and values.get('is_active'):
+                    self._add(job_id, values)
+
+    # Top k open jobs by the share of their required skills the candidate has
+    def match(self, skills, k=10):
+        self.load()
+        with self.lock:
+            counts = Counter()
+            for skill in skills:
+                counts.update(self.postings.get(skill, ()))
+
+            # Score everything in one pass, then check deadlines only while
+            # popping the best candidates
+            sizes = self.sizes
+            heap = [(-matched / sizes[job_id], -matched, -job_id) for job_id, matched in counts.items()]
+            heapq.heapify(heap)
+            now = datetime.utcnow()
+            top = []
+            while heap and len(top) < k:
+                score, matched, job_id = heapq.heappop(heap)
+                job = self.jobs[-job_id]
+                if job['application_deadline'] >= now:
+                    top.append((-score, job))
+
+        results = []
+        for score, job in top:
+            results.append({
+                'id': job['id'],
+                'title': job['title'],
+                'employer': job['employer'],
+                'location': job['location'],
+                'score': round(score, 4),
+                'matched_skills': sorted(job['skills'] & skills),
+                'missing_skills': sorted(job['skills'] - skills),
+            })
+        return results
+
+
+skill_index = SkillIndex()
+on_commit('jobs')(skill_index.apply)
@@ -0,0 +1,36 @@
+from sqlalchemy import event
+from models import db
+
+# Connection settings for SQLite databases, applied to every new connection.
+# WAL lets readers run while one writer commits; with synchronous=NORMAL a
+# commit only syncs the WAL at checkpoints, so writes stay durable through
+# an application crash but not a power loss. Set SQLITE_PRAGMAS to {} to
+# keep SQLite's defaults
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    # Wait for the write lock instead of failing with "database is locked"
+    'busy_timeout': 5000,
+    'foreign_keys': 'ON',
+    # 256 MB of the file memory-mapped, 64 MB of page cache per connection
+    'mmap_size': 268435456,
+    'cache_size': -65536,
+    'temp_store': 'MEMORY',
+}
+
+def apply_pragmas(engine, pragmas):
+    @event.listens_for(engine, 'connect')
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
+        cursor.close()
+
+
+# Call after db.init_app(app); engines for other databases are left alone
+def init_sqlite(app):
+    app.config.setdefault('SQLITE_PRAGMAS', SQLITE_PRAGMAS)
+    with app.app_context():
+        for engine in db.engines.values():
+            if engine.dialect.name == 'sqlite' and app.config['SQLITE_PRAGMAS']:
+                apply_pragmas(engine, app.config['SQLITE_PRAGMAS'])
@@ -0,0 +1,123 @@
+from flask import current_app
+from flask.cli import with_appcontext
+from models import db
+import click
+import json
+import subprocess
+import sys
+
+# Cold start: what importing app.py and serving the first requests costs.
+# Tooling and rarely used subsystems are imported on first use, not at startup:
+# the `flask db` commands load Flask-Migrate and Alembic when they run, and
+# similar.py loads numpy when it computes something. Check a change with
+#   flask startup-profile
+# or, against STARTUP_BUDGET_MS and FIRST_REQUEST_BUDGET_MS (exit status 1 when
+# over, or when a deferred module is imported at startup),
+#   flask startup-profile --check
+
+# Must not be imported by importing app.py and calling create_app()
+DEFERRED_MODULES = ('alembic', 'flask_migrate', 'numpy')
+# First requests after create_app(), in this order
+PROFILE_PATHS = (
+    '/get_jobs',
+    '/get_job?job_id=1',
+    '/search_jobs?q=python',
+    '/match_jobs?skills=Python, SQL',
+    '/autocomplete?q=so',
+    '/similar_jobs?job_id=1',
+)
+
+# Runs in a fresh interpreter, so nothing is imported beforehand
+PROFILE_SCRIPT = """
+import json, sys, time
+deferred, paths = json.loads(sys.argv[1])
+start = time.perf_counter()
+import app
+imported = time.perf_counter()
+application = app.create_app()
+created = time.perf_counter()
+print('startup done', file=sys.stderr, flush=True)
+loaded = [name for name in deferred if name in sys.modules]
+client = application.test_client()
+requests = []
+for path in paths:
+    request_start = time.perf_counter()
+    status = client.get(path).status_code
+    requests.append((path, status, time.perf_counter() - request_start))
+print(json.dumps({'import': imported - start, 'create_app': created - imported,
+                  'loaded': loaded, 'requests': requests}))
+"""
+
+
+# Stands in for Flask-Migrate's `flask db` group, which is imported (with
+# Alembic) and takes over once a db command runs
+class MigrateCommands(click.Group):
+    def make_context(self, info_name, args, parent=None, **extra):
+        from flask_migrate import Migrate
+        from flask_migrate.cli import db as commands
+        app = current_app._get_current_object()
+        if 'migrate' not in app.extensions:
+            Migrate(app, db)
+        return commands.make_context(info_name, args, parent=parent, **extra)
+
+
+migrate_commands = MigrateCommands('db', help="Perform database migrations.")
+
+
+# One cold start: the profile dict printed by PROFILE_SCRIPT, plus the
+# self time of each imported module from python -X importtime
+def profile_once():
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', PROFILE_SCRIPT, json.dumps([DEFERRED_MODULES, PROFILE_PATHS])],
+        capture_output=True, text=True,
+    )
+    if result.returncode:
+        raise click.ClickException(f"Profiling run failed:\n{result.stderr[-2000:]}")
+    profile = json.loads(result.stdout.splitlines()[-1])
+    profile['modules'] = {}
+    # Only the imports before the first request
+    for line in result.stderr.split('startup done\n', 1)[0].splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, _, name = line[len('import time:'):].split('|')
+        profile['modules'][name.strip()] = int(self_us) / 1e6
+    return profile
+
+
+@click.command('startup-profile')
+@click.option('--runs', default=3, show_default=True, help="Cold starts to run; the fastest is reported.")
+@click.option('--top', default=10, show_default=True, help="Packages to list in the import breakdown.")
+@click.option('--check', is_flag=True, help="Exit with status 1 when over budget.")
+@with_appcontext
+def startup_profile(runs, top, check):
+    profile = min((profile_once() for _ in range(runs)), key=lambda p: p['import'] + p['create_app'])
+    startup = profile['import'] + profile['create_app']
+
+    packages = {}
+    for name, seconds in profile['modules'].items():
+        package = name.split('.', 1)[0]
+        packages[package] = packages.get(package, 0) + seconds
+    print(f"Startup: {startup * 1000:.1f} ms (import app {profile['import'] * 1000:.1f} ms, "
+          f"create_app() {profile['create_app'] * 1000:.1f} ms)")
+    print(f"Slowest imports ({len(profile['modules'])} modules, self time by package):")
+    for package, seconds in sorted(packages.items(), key=lambda item: -item[1])[:top]:
+        print(f"  {package:<32} {seconds * 1000:8.1f} ms")
+    print("First requests:")
+    for path, status, seconds in profile['requests']:
+        print(f"  {path:<32} {status:4} {seconds * 1000:8.1f} ms")
+
+    if not check:
+        return
+    failures = []
+    budget = current_app.config['STARTUP_BUDGET_MS']
+    if startup * 1000 > budget:
+        failures.append(f"startup took {startup * 1000:.0f} ms, budget {budget} ms")
+    budget = current_app.config['FIRST_REQUEST_BUDGET_MS']
+    for path, status, seconds in profile['requests']:
+        if seconds * 1000 > budget:
+            failures.append(f"first {path} took {seconds * 1000:.0f} ms, budget {budget} ms")
+    for name in profile['loaded']:
+        failures.append(f"{name} is imported at startup; it should be imported on first use")
+    if failures:
+        raise click.ClickException("Over the startup budget:\n  " + "\n  ".join(failures))
+    print("Within the startup budget.")
@@ -0,0 +1,77 @@
+from datetime import datetime
+from sqlalchemy import insert, update
+from asgi import AsyncAPI
+from cache import response_cache
+from models import db, Job, TableVersion
+import asyncio
+import json
+
+JOB = {
+    'title': 'Python Developer', 'description': 'Build APIs', 'location': 'Nairobi, Kenya',
+    'job_type': 'Full-time', 'application_deadline': '2030-01-01 00:00:00', 'employer': 'Acme',
+    'employer_email': 'hr@acme.co.ke',
+}
+
+
+# One request through the ASGI app; chunks are the body's http.request messages
+def call(api, method, path, headers, chunks):
+    messages = [{'type': 'http.request', 'body': chunk, 'more_body': i < len(chunks) - 1}
+                for i, chunk in enumerate(chunks)]
+    sent = []
+
+    async def receive():
+        return messages.pop(0)
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {
+        'type': 'http', 'method': method, 'path': path, 'query_string': b'', 'root_path': '',
+        'headers': [(name.encode(), value.encode()) for name, value in headers], 'http_version': '1.1',
+    }
+    asyncio.run(api(scope, receive, send))
+    return sent[0]['status'], b''.join(message.get('body', b'') for message in sent[1:])
+
+
+def test_chunked_upload_reaches_flask(app, admin_headers):
+    api = AsyncAPI(app)
+    rows = [json.dumps(dict(JOB, title=f'Job {i}')).encode() + b'\n' for i in range(3)]
+    # Chunked: no Content-Length, the body arrives in several messages
+    status, body = call(api, 'POST', '/bulk/jobs',
+                        [('content-type', 'application/x-ndjson'), ('transfer-encoding', 'chunked'),
+                         ('authorization', admin_headers['Authorization'])], rows)
+    assert status == 200
+    assert json.loads(body)['created'] == 3
+
+
+# Closes the API's async engines, as the server's lifespan shutdown does
+def shut_down(api):
+    messages = [{'type': 'lifespan.startup'}, {'type': 'lifespan.shutdown'}]
+
+    async def receive():
+        return messages.pop(0)
+
+    async def send(message):
+        pass
+
+    asyncio.run(api({'type': 'lifespan'}, receive, send))
+
+
+# A write by another worker moves table_versions but not this process's cache
+# tags; the async path must not serve the old body under the new ETag
+def test_cached_listing_follows_other_workers(app, fill, monkeypatch):
+    monkeypatch.setattr(response_cache, 'enabled', True)
+    api = AsyncAPI(app)
+    fill(1)
+    try:
+        status, body = call(api, 'GET', '/get_jobs', [], [b''])
+        assert status == 200 and len(json.loads(body)) == 1
+
+        with app.app_context():
+            with db.engine.begin() as conn:
+                conn.execute(insert(Job), [dict(JOB, application_deadline=datetime(2030, 1, 1))])
+                conn.execute(update(TableVersion).where(TableVersion.name == 'jobs').values(version=TableVersion.version + 1))
+        status, body = call(api, 'GET', '/get_jobs', [], [b''])
+        assert status == 200 and len(json.loads(body)) == 2
+    finally:
+        shut_down(api)
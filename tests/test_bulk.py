@@ -0,0 +1,24 @@
+import pytest
+
+WRITES = [
+    ('post', '/bulk/jobs', []),
+    ('post', '/bulk/applications', []),
+    ('put', '/applications/status', {'application_ids': [1], 'status': 'accepted'}),
+]
+
+
+# Bulk writes are admin only, like the single-row ones
+@pytest.mark.parametrize('method, path, body', WRITES)
+def test_bulk_writes_need_admin(app, client, method, path, body):
+    from flask_jwt_extended import create_access_token
+    assert getattr(client, method)(path, json=body).status_code == 401
+    with app.app_context():
+        token = create_access_token(identity='1', additional_claims={'role': 'graduate'})
+    assert getattr(client, method)(path, json=body, headers={'Authorization': f'Bearer {token}'}).status_code == 403
+
+
+def test_admin_moves_application_status(client, admin_headers, fill):
+    fill(1)
+    response = client.put('/applications/status', json={'application_ids': [1], 'status': 'accepted'},
+                          headers=admin_headers)
+    assert response.status_code == 200
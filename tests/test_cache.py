@@ -0,0 +1,68 @@
+from datetime import datetime, timedelta
+from sqlalchemy import insert, update
+from cache import response_cache
+from models import db, Job, TableVersion
+import time
+
+
+# A deadline passing is no write, so only the clock can expire a cached
+# open=true listing
+def test_open_jobs_cache_follows_the_clock(app, client, monkeypatch):
+    monkeypatch.setattr(response_cache, 'enabled', True)
+    with app.app_context():
+        db.session.execute(insert(Job), [{
+            'title': 'Nurse', 'description': 'Ward duties', 'location': 'Kisumu, Kenya', 'job_type': 'Full-time',
+            'application_deadline': datetime.utcnow() + timedelta(days=1), 'employer': 'Gamma',
+            'employer_email': 'hr@gamma.co.ke',
+        }])
+        db.session.commit()
+    assert len(client.get('/get_jobs?open=true').get_json()) == 1
+
+    # The deadline passes, without the write hooks seeing it
+    with app.app_context():
+        with db.engine.begin() as conn:
+            conn.execute(update(Job).values(application_deadline=datetime.utcnow() - timedelta(minutes=1)))
+    now = time.time()
+    monkeypatch.setattr(time, 'time', lambda: now + 60)
+    assert client.get('/get_jobs?open=true').get_json() == []
+
+
+
+# Facet counts are cached per filter set until the next job write
+def test_facet_counts_follow_job_writes(client, admin_headers, fill):
+    fill(2)
+    assert client.get('/job_facets').get_json()['total'] == 2
+    assert client.get('/job_facets').get_json()['total'] == 2
+    client.post('/bulk/jobs', headers=admin_headers, json=[{
+        'title': 'Nurse', 'description': 'Ward duties', 'location': 'Kisumu, Kenya', 'job_type': 'Full-time',
+        'application_deadline': '2030-01-01 00:00:00', 'employer': 'Gamma', 'employer_email': 'hr@gamma.co.ke',
+    }])
+    assert client.get('/job_facets').get_json()['total'] == 3
+
+
+# Another worker's write: the row and its table_versions bump, without this
+# process's write hooks
+def external_job_write(app):
+    with app.app_context():
+        with db.engine.begin() as conn:
+            conn.execute(insert(Job), [{
+                'title': 'Nurse', 'description': 'Ward duties', 'location': 'Kisumu, Kenya',
+                'job_type': 'Full-time', 'application_deadline': datetime(2030, 1, 1), 'employer': 'Gamma',
+                'employer_email': 'hr@gamma.co.ke',
+            }])
+            conn.execute(update(TableVersion).where(TableVersion.name == 'jobs').values(version=TableVersion.version + 1))
+
+
+# The cached body has to follow the ETag, which follows table_versions
+def test_cached_listing_follows_other_workers(app, client, fill, monkeypatch):
+    monkeypatch.setattr(response_cache, 'enabled', True)
+    fill(1)
+    first = client.get('/get_jobs')
+    assert len(first.get_json()) == 1
+    assert client.get('/get_jobs', headers={'If-None-Match': first.headers['ETag']}).status_code == 304
+
+    external_job_write(app)
+    response = client.get('/get_jobs', headers={'If-None-Match': first.headers['ETag']})
+    assert response.status_code == 200
+    assert len(response.get_json()) == 2
+    assert response.headers['ETag'] != first.headers['ETag']
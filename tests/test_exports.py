@@ -0,0 +1,12 @@
+from exports import _cell
+import pytest
+
+
+@pytest.mark.parametrize('value', ['=1+1', '+SUM(A1)', '-2+3', '@cmd', '\t=1', '\r=1', '+254 712345678'])
+def test_formula_cells_are_quoted(value):
+    assert _cell(value) == "'" + value
+
+
+@pytest.mark.parametrize('value', ['Python Developer', '', 5000, None, 'a=b'])
+def test_other_cells_are_unchanged(value):
+    assert _cell(value) == value
@@ -0,0 +1,38 @@
+from datetime import datetime
+from sqlalchemy import insert, update
+from autocomplete import autocomplete
+from etags import table_versions
+from models import db, Job, TableVersion
+from skills import skill_index
+
+JOB = {
+    'title': 'Kotlin Developer', 'description': 'Android apps', 'location': 'Nairobi, Kenya',
+    'job_type': 'Full-time', 'application_deadline': datetime(2030, 1, 1), 'employer': 'Acme',
+    'employer_email': 'hr@acme.co.ke', 'skills_required': 'Kotlin, Android', 'is_active': True,
+}
+
+
+# Another worker's write: the row and its table_versions bump, without this
+# process's commit hooks
+def test_indexes_follow_other_workers(app, client):
+    assert client.get('/match_jobs?skills=kotlin').get_json() == []
+    assert client.get('/autocomplete?q=kot').get_json() == []
+
+    with app.app_context():
+        with db.engine.begin() as conn:
+            conn.execute(insert(Job), [JOB])
+            conn.execute(update(TableVersion).where(TableVersion.name == 'jobs').values(version=TableVersion.version + 1))
+    assert [job['title'] for job in client.get('/match_jobs?skills=kotlin').get_json()] == ['Kotlin Developer']
+    assert [row['text'] for row in client.get('/autocomplete?q=kot').get_json()] == ['Kotlin Developer']
+
+
+# This process's own writes are patched in, and don't cost a rebuild
+def test_own_writes_keep_the_indexes(app, client, admin_headers):
+    client.get('/match_jobs?skills=kotlin')
+    client.get('/autocomplete?q=kot')
+    client.post('/bulk/jobs', headers=admin_headers, json=[dict(JOB, application_deadline='2030-01-01 00:00:00')])
+    with app.app_context():
+        version = table_versions(['jobs'])[0]
+    assert skill_index.version == autocomplete.version == version
+    assert [job['title'] for job in client.get('/match_jobs?skills=kotlin').get_json()] == ['Kotlin Developer']
+    assert [row['text'] for row in client.get('/autocomplete?q=kot').get_json()] == ['Kotlin Developer']
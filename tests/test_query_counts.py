@@ -0,0 +1,61 @@
+from sqlalchemy import event, insert
+from models import db, JobApplication, Payment
+import pytest
+
+LIST_PATHS = ('/get_applications', '/get_payments', '/get_job_resources')
+
+
+# Statements one request runs, after a first request has loaded whatever the
+# app loads once (e.g. the revoked-token filter)
+def statements(app, client, path, headers):
+    client.get(path, headers=headers)
+    count = 0
+
+    def counted(*args):
+        nonlocal count
+        count += 1
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, 'before_cursor_execute', counted)
+    try:
+        response = client.get(path, headers=headers)
+    finally:
+        event.remove(engine, 'before_cursor_execute', counted)
+    assert response.status_code == 200
+    return count, len(response.get_json())
+
+
+@pytest.mark.parametrize('path', LIST_PATHS)
+def test_list_statements_dont_grow_with_rows(app, client, admin_headers, fill, path):
+    fill(5)
+    few, rows = statements(app, client, path, admin_headers)
+    assert rows == 5
+    fill(50)
+    many, rows = statements(app, client, path, admin_headers)
+    assert rows == 50
+    assert many == few
+
+
+# Updating a user reads back only the users row, not the applications and
+# payments that point at it
+def test_update_user_reads_no_children(app, client, admin_headers, fill):
+    fill(1)
+    with app.app_context():
+        db.session.execute(insert(JobApplication), [{'user_id': 1, 'job_id': 1, 'status': 'pending'}] * 50)
+        db.session.execute(insert(Payment), [{'user_id': 1, 'amount': 5000}] * 50)
+        db.session.commit()
+        engine = db.engine
+    tables = []
+
+    def capture(conn, cursor, statement, *args):
+        tables.extend(table for table in ('job_applications', 'payments') if f' {table}' in statement)
+
+    event.listen(engine, 'before_cursor_execute', capture)
+    try:
+        response = client.put('/update_user/1', json={'phone': '0700000000'}, headers=admin_headers)
+    finally:
+        event.remove(engine, 'before_cursor_execute', capture)
+    assert response.status_code == 200
+    assert response.get_json()['phone'] == '0700000000'
+    assert tables == []
@@ -0,0 +1,63 @@
+from sqlalchemy import event
+from models import db
+import pytest
+
+# Every lookup the API makes by a request argument, run against SQLite with
+# EXPLAIN QUERY PLAN: each table the endpoint's queries read must be reached
+# through an index (or the rowid), never a full scan. A schema or query change
+# that drops one of them fails here
+LOOKUP_PATHS = (
+    '/get_job?job_id=2',
+    '/get_job?job_name=Job 2',
+    '/get_jobs?location=Remote',
+    '/get_jobs?job_type=Full-time',
+    '/get_jobs?is_active=true&open=true',
+    '/get_user?user_id=2',
+    '/get_user?username=user2',
+    '/get_payment?payment_id=2',
+    '/get_payment?username=user2',
+    '/get_application?application_id=2',
+    '/get_application?username=user2',
+    '/get_application?job_name=Job 2',
+    '/get_job_resource?resource_id=2',
+    '/get_job_resource?job_name=Job 2',
+    '/get_job_resource?resource_type=Document',
+)
+# Bookkeeping (ETag versions, revoked tokens) isn't part of the lookups
+API_TABLES = ('users', 'jobs', 'job_applications', 'payments', 'extra_resources')
+
+
+# The SELECTs a request runs, with their parameters
+def selects(app, client, path, headers):
+    captured = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith('SELECT') and any(f' {table}' in statement for table in API_TABLES):
+            captured.append((statement, parameters))
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, 'before_cursor_execute', capture)
+    try:
+        response = client.get(path, headers=headers)
+    finally:
+        event.remove(engine, 'before_cursor_execute', capture)
+    assert response.status_code == 200, response.get_json()
+    return captured
+
+
+@pytest.mark.parametrize('path', LOOKUP_PATHS)
+def test_lookups_use_indexes(app, client, admin_headers, fill, path):
+    if app.config['SQLALCHEMY_DATABASE_URI'].split(':', 1)[0] != 'sqlite':
+        pytest.skip("EXPLAIN QUERY PLAN is SQLite's")
+    fill(20)
+    statements = selects(app, client, path, admin_headers)
+    assert statements
+    with app.app_context():
+        connection = db.session.connection().connection.driver_connection
+        for statement, parameters in statements:
+            plan = [row[3] for row in connection.execute(f'EXPLAIN QUERY PLAN {statement}', parameters)]
+            for step in plan:
+                if step.startswith(('SCAN', 'SEARCH')):
+                    assert 'USING INDEX' in step or 'USING COVERING INDEX' in step \
+                        or 'INTEGER PRIMARY KEY' in step, f"{path}: {step}\n{statement}"
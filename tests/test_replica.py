@@ -0,0 +1,41 @@
+from sqlalchemy import insert
+from models import db, User, Payment
+from replica import replicas
+import pytest
+
+
+@pytest.fixture
+def replica_app(app, tmp_path):
+    if app.config['SQLALCHEMY_DATABASE_URI'].split(':', 1)[0] != 'sqlite':
+        pytest.skip("the replica copy needs a SQLite primary")
+    from app import create_app
+    config = {key: app.config[key] for key in ('TESTING', 'SQLALCHEMY_DATABASE_URI', 'SIMILAR_JOBS_PATH',
+                                                'CACHE_BACKEND', 'PASSWORD_WORKERS')}
+    replica_app = create_app(dict(config, DATABASE_REPLICA_URL=f'sqlite:///{tmp_path}/replica.db'))
+    with replica_app.app_context():
+        db.session.execute(insert(User), [{'username': 'grace', 'email': 'grace@example.com', 'password_hash': 'x', 'role': 'premium_graduate'}])
+        db.session.execute(insert(Payment), [{'user_id': 1, 'amount': 5000}])
+        db.session.commit()
+        replicas.refresh()
+    yield replica_app
+    with replica_app.app_context():
+        for engine in db.engines.values():
+            engine.dispose()
+
+
+def test_reports_read_the_replica(replica_app, admin_headers):
+    client = replica_app.test_client()
+    with replica_app.app_context():
+        db.session.execute(insert(Payment), [{'user_id': 1, 'amount': 7000}])
+        db.session.commit()
+    # Nobody here wrote through the API, so the stale replica answers
+    assert len(client.get('/get_payments', headers=admin_headers).get_json()) == 1
+
+
+# /add_payment has no role check; the write must still be remembered under
+# the admin's token, which /get_payments looks up
+def test_admin_reads_own_write(replica_app, admin_headers):
+    client = replica_app.test_client()
+    response = client.post('/add_payment', json={'user_id': 1, 'payment_date': '2025-01-02 10:00:00'}, headers=admin_headers)
+    assert response.status_code == 201
+    assert len(client.get('/get_payments', headers=admin_headers).get_json()) == 2
@@ -0,0 +1,45 @@
+from datetime import datetime, timedelta
+from sqlalchemy import insert
+from models import db, Job
+from search import substring_search
+
+
+def add_jobs(app):
+    deadline = datetime.utcnow() + timedelta(days=30)
+    with app.app_context():
+        db.session.execute(insert(Job), [
+            {'title': 'Python Developer', 'description': 'Build APIs in Python and SQL', 'location': 'Nairobi, Kenya',
+             'job_type': 'Full-time', 'application_deadline': deadline, 'employer': 'Acme',
+             'employer_email': 'hr@acme.co.ke', 'skills_required': 'Python, SQL'},
+            {'title': 'Data Analyst', 'description': 'Reports, some python scripting', 'location': 'Remote',
+             'job_type': 'Contract', 'application_deadline': deadline, 'employer': 'Beta',
+             'employer_email': 'hr@beta.co.ke', 'skills_required': 'Excel'},
+            {'title': 'Nurse', 'description': 'Ward duties', 'location': 'Kisumu, Kenya',
+             'job_type': 'Full-time', 'application_deadline': deadline, 'employer': 'Gamma',
+             'employer_email': 'hr@gamma.co.ke', 'skills_required': 'Care'},
+        ])
+        db.session.commit()
+
+
+# Runs on the configured database's search (FTS5, or PostgreSQL text search)
+def test_search_ranks_title_matches_first(app, client):
+    add_jobs(app)
+    response = client.get('/search_jobs?q=pyth')
+    assert response.status_code == 200
+    results = response.get_json()
+    assert [result['title'] for result in results] == ['Python Developer', 'Data Analyst']
+    assert '<mark>' in results[0]['title_highlight']
+    assert results[0]['score'] > results[1]['score']
+
+
+def test_search_needs_a_word(client):
+    assert client.get('/search_jobs?q=%20!').status_code == 400
+
+
+def test_substring_search(app):
+    add_jobs(app)
+    with app.app_context():
+        results = substring_search('python sql', 10, 0)
+    assert [result['title'] for result in results] == ['Python Developer']
+    assert set(results[0]) == {'id', 'title', 'employer', 'location', 'job_type', 'salary_min', 'salary_max',
+                               'application_deadline', 'title_highlight', 'snippet', 'score'}
@@ -0,0 +1,29 @@
+from config import Config
+from startup import DEFERRED_MODULES, profile_once
+import json
+import subprocess
+import sys
+
+IMPORTED = """
+import json, sys
+import app
+app.create_app()
+print(json.dumps(sorted(sys.modules)))
+"""
+
+
+# Migration tooling and numpy load on first use (see startup.py); a new
+# top-level import of one of them shows up here
+def test_startup_defers_modules():
+    result = subprocess.run([sys.executable, '-c', IMPORTED], capture_output=True, text=True, check=True)
+    imported = set(json.loads(result.stdout.splitlines()[-1]))
+    assert [name for name in DEFERRED_MODULES if name in imported] == []
+
+
+# The same budget flask startup-profile --check enforces, best of three cold
+# starts. Its first requests go to an empty scratch database, not Job.db
+def test_startup_budget(tmp_path, monkeypatch):
+    monkeypatch.setenv('DATABASE_URL', f'sqlite:///{tmp_path}/startup.db')
+    profile = min((profile_once() for _ in range(3)), key=lambda p: p['import'] + p['create_app'])
+    assert profile['loaded'] == []
+    assert (profile['import'] + profile['create_app']) * 1000 < Config.STARTUP_BUDGET_MS
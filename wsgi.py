@@ -0,0 +1,8 @@
+from app import create_app
+from prefork import prefork
+
+# WSGI entry point for pre-fork servers. With --preload the app and its
+# indexes are built once in the server process and shared by the workers
+#   gunicorn --preload --workers 4 wsgi:app
+app = create_app()
+prefork.preload(app)